@@ -0,0 +1,155 @@
+"""Estadísticas agregadas por jugador.
+
+Toda la tabla jugador x métrica se calcula con una sola pasada sobre los
+eventos: cada métrica es una columna indicadora y un único ``groupby`` las suma.
+
+Como todas las métricas base son conteos, los totales de la temporada son la
+suma de los parciales de cada partido. El almacén guarda los parciales junto a
+cada partición y los totales en ``temporada_*.arrow``; al ingerir un partido
+nuevo (o corregido/eliminado) solo se suman o restan sus parciales.
+"""
+
+from pathlib import Path
+
+import pandas as pd
+import pyarrow.feather as feather
+
+# Archivo con el hash del CSV del que salieron los parciales de una partición
+HUELLA = "parciales.sha1"
+
+# Métricas de conteo (se pueden sumar entre partidos)
+METRICAS = [
+    "pases_correctos",
+    "pases_incorrectos",
+    "total_tiros",
+    "tiros_al_arco",
+    "goles",
+    "pelotas_recuperadas",
+    "pelotas_perdidas",
+    "faltas_realizadas",
+    "faltas_recibidas",
+    "partidos_jugados",
+]
+
+
+def eventos_de_jugadores(df):
+    """Eventos con jugador (sin los del equipo, ``Player == "-"``)."""
+    return df[df["Player"].notna() & (df["Player"] != "-")]
+
+
+def indicadores(df):
+    """Una columna booleana por métrica de conteo (todas menos ``partidos_jugados``), alineada con ``df``."""
+    evento = df["Event"]
+    tiro = evento == "Tiro"
+    resultado = df["Result"]
+    return pd.DataFrame({
+        "pases_correctos": evento == "PB",
+        "pases_incorrectos": evento == "PM",
+        "total_tiros": tiro,
+        "tiros_al_arco": tiro & resultado.isin(["Arco", "Gol"]),
+        "goles": tiro & (resultado == "Gol"),
+        "pelotas_recuperadas": evento == "Recuperacion",
+        "pelotas_perdidas": evento == "Perdida",
+        "faltas_realizadas": evento == "Falta",
+        "faltas_recibidas": evento == "Falta recibida",
+    })
+
+
+def conteos_jugadores(df, por=("Player",)):
+    """Conteos por jugador (índice ``Player``) en las columnas de ``METRICAS``.
+
+    Con ``por=("Player", "Partido")`` sale una fila por jugador y partido.
+    """
+    por = list(por)
+    df = eventos_de_jugadores(df)
+    conteos = indicadores(df).groupby([df[c] for c in por], observed=True).sum().astype("int64")
+    conteos["partidos_jugados"] = df.groupby(por, observed=True)["Partido"].nunique()
+    if conteos.index.nlevels > 1:
+        conteos.index = conteos.index.set_levels([lvl.astype(str) for lvl in conteos.index.levels])
+    else:
+        conteos.index = conteos.index.astype(str)
+    return conteos[METRICAS]
+
+
+def conteos_pares(df):
+    """Pases completados por par pasador -> receptor (índice ``Player``, ``recep``)."""
+    pases = df[(df["Event"] == "PB") & df["recep"].notna()]
+    pares = pases.groupby(["Player", "recep"], observed=True).size().rename("pases").to_frame()
+    pares.index = pares.index.set_levels([lvl.astype(str) for lvl in pares.index.levels])
+    return pares
+
+
+def conteos(df):
+    """Parciales aditivos de ``df`` (un partido o toda la temporada)."""
+    return {"jugadores": conteos_jugadores(df), "pares": conteos_pares(df)}
+
+
+def acumular(totales, parciales, signo=1):
+    """Suma (``signo=1``) o resta (``signo=-1``) parciales a los totales de temporada."""
+    if totales is None:
+        totales = {clave: tabla.iloc[0:0] for clave, tabla in parciales.items()}
+    resultado = {}
+    for clave, tabla in totales.items():
+        suma = tabla.add(signo * parciales[clave], fill_value=0)
+        # Un jugador o par que queda en cero (partido eliminado) deja de aparecer
+        resultado[clave] = suma[(suma != 0).any(axis=1)].astype("int64").sort_index()
+    return resultado
+
+
+def _guardar(tablas, directorio, prefijo):
+    for clave, tabla in tablas.items():
+        ruta = Path(directorio) / f"{prefijo}{clave}.arrow"
+        tmp = ruta.with_name(ruta.name + ".tmp")
+        feather.write_feather(tabla.reset_index(), tmp, compression="uncompressed")
+        tmp.replace(ruta)
+
+
+def _leer(directorio, prefijo):
+    tablas = {}
+    for clave, indice in (("jugadores", ["Player"]), ("pares", ["Player", "recep"])):
+        ruta = Path(directorio) / f"{prefijo}{clave}.arrow"
+        if not ruta.exists():
+            return None
+        tablas[clave] = feather.read_feather(ruta).set_index(indice)
+    return tablas
+
+
+def guardar_parciales(directorio, parciales, huella):
+    """Guarda los parciales de un partido junto con la ``huella`` (hash del CSV) de la que salieron.
+
+    La huella se borra antes y se escribe al final: si la escritura se corta, los
+    parciales quedan sin huella y ``leer_parciales`` no los da por buenos.
+    """
+    marca = Path(directorio) / HUELLA
+    marca.unlink(missing_ok=True)
+    _guardar(parciales, directorio, "")
+    marca.write_text(huella, encoding="utf-8")
+
+
+def leer_parciales(directorio, huella):
+    """Parciales del partido si son los de ``huella``; ``None`` si faltan o son de otra versión del CSV."""
+    marca = Path(directorio) / HUELLA
+    if not marca.exists() or marca.read_text(encoding="utf-8") != huella:
+        return None
+    return _leer(directorio, "")
+
+
+def guardar_temporada(destino, totales):
+    _guardar(totales, destino, "temporada_")
+
+
+def leer_temporada(destino):
+    return _leer(destino, "temporada_")
+
+
+def completar_estadisticas(conteos):
+    """Agrega las métricas derivadas (totales y porcentajes) a una tabla de conteos."""
+    stats = conteos.copy()
+    stats["total_pases"] = stats["pases_correctos"] + stats["pases_incorrectos"]
+    stats["porcentaje_pases"] = (stats["pases_correctos"] / stats["total_pases"] * 100).fillna(0.0)
+    return stats.rename_axis("jugador").reset_index()
+
+
+def estadisticas_jugadores(df):
+    """Tabla completa jugador x métrica, una fila por jugador (columna ``jugador``)."""
+    return completar_estadisticas(conteos_jugadores(df))
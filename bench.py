@@ -0,0 +1,146 @@
+"""Benchmark del pipeline de análisis sobre temporadas sintéticas.
+
+Genera temporadas de distinto tamaño con ``sintetico.py`` y mide tiempo y
+pico de memoria (tracemalloc) de cada etapa: carga de CSV, ingesta y lectura
+del almacén, estadísticas por jugador, posesiones, tendencias, red de pases,
+zonas/heatmap, índice espacial y rasterizado de figuras::
+
+    python bench.py [--partidos 2 40 400] [--equipos 1] [--json resultados.json]
+"""
+
+import argparse
+import json
+import shutil
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+from mplsoccer import Pitch  # noqa: E402
+
+import agregados  # noqa: E402
+import datos  # noqa: E402
+import graficos  # noqa: E402
+import posesiones  # noqa: E402
+import red_pases  # noqa: E402
+import sintetico  # noqa: E402
+import tendencias  # noqa: E402
+import zonas  # noqa: E402
+from cache_figuras import rasterizar  # noqa: E402
+from indice_espacial import IndiceEspacial  # noqa: E402
+
+
+def medir(funcion, repeticiones=3):
+    """Mejor tiempo y pico de memoria de ``funcion()``, junto con su resultado."""
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    # El pico de memoria se mide en una corrida aparte para no contaminar los tiempos
+    tracemalloc.start()
+    funcion()
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"segundos": min(tiempos), "pico_bytes": pico}, resultado
+
+
+def correr(n_partidos, n_equipos=1, repeticiones=3):
+    resultados = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        origen, almacen = Path(tmp) / "csv", Path(tmp) / "almacen"
+        sintetico.generar_temporada(origen, n_partidos, n_equipos)
+
+        def ingesta():
+            # Siempre desde cero para medir el costo completo de la ingesta
+            shutil.rmtree(almacen, ignore_errors=True)
+            return datos.ingestar(origen, almacen)
+
+        resultados["carga_csv"], df = medir(lambda: datos.cargar_eventos(datos.descubrir_partidos(origen)), repeticiones)
+        resultados["ingesta"], _ = medir(ingesta, 1)
+        resultados["lectura_almacen"], _ = medir(lambda: datos.leer_almacen(almacen), repeticiones)
+        partido = next(iter(datos.leer_manifiesto(almacen)["partidos"]))
+        resultados["lectura_partido"], df_partido = medir(lambda: datos.leer_almacen(almacen, [partido]), repeticiones)
+
+        resultados["estadisticas_jugadores"], _ = medir(lambda: agregados.estadisticas_jugadores(df), repeticiones)
+
+        def posesiones_temporada():
+            segmentos = posesiones.segmentar(df)
+            return posesiones.metricas(df, segmentos)
+
+        resultados["posesiones"], _ = medir(posesiones_temporada, repeticiones)
+
+        partidos = datos.partidos_disponibles(datos.fuente_datos(origen, almacen))
+        resultados["tendencias_partidos"], por_partido = medir(lambda: tendencias.por_partido(df, partidos), repeticiones)
+        resultados["forma_jugadores"], _ = medir(lambda: tendencias.forma_jugadores(por_partido, 5), repeticiones)
+        resultados["tramos_minutos"], _ = medir(lambda: tendencias.por_minuto(df), repeticiones)
+
+        pases = df[df["Event"] == "PB"].dropna(subset=["X", "Y", "X2", "Y2"])
+        pases_partido = df_partido[df_partido["Event"] == "PB"].dropna(subset=["X", "Y", "X2", "Y2"])
+
+        def red_temporada():
+            redes = [red_pases.construir_red(grupo) for _, grupo in pases.groupby("Partido", observed=True)]
+            return red_pases.metricas_red(red_pases.combinar_redes(redes))
+
+        resultados["red_partido"], red = medir(lambda: red_pases.construir_red(pases_partido), repeticiones)
+        resultados["red_temporada"], _ = medir(red_temporada, 1)
+
+        rejilla = zonas.REJILLAS["3x3"]
+        resultados["heatmap"], _ = medir(
+            lambda: zonas.conteo_por_zona(zonas.zonificar(pases, rejilla)["inicio"], rejilla), repeticiones
+        )
+
+        resultados["indice_espacial"], indice = medir(lambda: IndiceEspacial(df), repeticiones)
+        resultados["consulta_zona"], _ = medir(lambda: indice.zona(8, rejilla), repeticiones)
+        resultados["consulta_corredor"], _ = medir(lambda: indice.corredor_zonas(4, 7, rejilla), repeticiones)
+
+        jugador = pases_partido["Player"].value_counts().index[0]
+        pases_jugador = df_partido[df_partido["Event"].isin(["PB", "PM"]) & (df_partido["Player"] == jugador)]
+
+        def figura_pases():
+            pitch = Pitch(pitch_type="opta")
+            fig, ax = pitch.draw(figsize=(6, 4))
+            graficos.dibujar_pases(pases_jugador, ax, pitch)
+            return rasterizar(fig)
+
+        def figura_red():
+            pitch = Pitch(pitch_type="opta", line_color="black", pitch_color="white")
+            fig, ax = pitch.draw(figsize=(12, 8))
+            pos = red_pases.posiciones(red)
+            graficos.dibujar_conexiones(red_pases.aristas(red, pos), ax, pitch, "green")
+            pitch.scatter(pos.X, pos.Y, ax=ax, color="black", s=200, zorder=3)
+            return rasterizar(fig)
+
+        resultados["figura_pases"], _ = medir(figura_pases, repeticiones)
+        resultados["figura_red"], _ = medir(figura_red, repeticiones)
+        eventos = len(df)
+    return eventos, resultados
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del pipeline de análisis.")
+    parser.add_argument("--partidos", type=int, nargs="+", default=[2, 40, 400])
+    parser.add_argument("--equipos", type=int, default=1)
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--json", type=Path, help="guardar los resultados en este archivo")
+    args = parser.parse_args()
+
+    salida = []
+    for n in args.partidos:
+        eventos, resultados = correr(n, args.equipos, args.repeticiones)
+        print(f"\n{n} partidos x {args.equipos} equipo(s) ({eventos} eventos)")
+        print(f"  {'etapa':<24}{'tiempo (ms)':>12}{'pico (MB)':>12}")
+        for etapa, r in resultados.items():
+            print(f"  {etapa:<24}{r['segundos'] * 1000:>12.1f}{r['pico_bytes'] / 2**20:>12.1f}")
+        salida.append({"partidos": n, "equipos": args.equipos, "eventos": eventos, "etapas": resultados})
+
+    if args.json:
+        args.json.write_text(json.dumps(salida, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
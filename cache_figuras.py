@@ -0,0 +1,67 @@
+"""Cache de figuras ya rasterizadas.
+
+Guarda los bytes PNG/SVG de cada figura bajo una clave con los parámetros de
+la vista (página, partido, jugador, filtros) y la versión de los datos. Las
+vistas repetidas se sirven sin volver a dibujar la cancha. Se desalojan las
+menos usadas cuando se supera el presupuesto de bytes.
+"""
+
+import io
+import threading
+from collections import OrderedDict
+
+LIMITE_BYTES_DEFECTO = 64 * 2**20
+
+
+def rasterizar(fig, formato="png", ancho_max_px=None, **kwargs):
+    """Serializa la figura y la libera de pyplot para no acumular memoria entre reruns.
+
+    Con ``ancho_max_px`` se baja el dpi para que la imagen no supere ese ancho.
+    """
+    import matplotlib.pyplot as plt
+
+    kwargs.setdefault("bbox_inches", "tight")
+    kwargs.setdefault("dpi", 200)
+    if ancho_max_px:
+        kwargs["dpi"] = min(kwargs["dpi"], ancho_max_px / fig.get_figwidth())
+    buffer = io.BytesIO()
+    try:
+        fig.savefig(buffer, format=formato, **kwargs)
+    finally:
+        plt.close(fig)
+    return buffer.getvalue()
+
+
+class CacheFiguras:
+    """LRU de bytes de figuras con presupuesto total en bytes. Segura entre hilos (sesiones)."""
+
+    def __init__(self, limite_bytes=LIMITE_BYTES_DEFECTO):
+        self.limite_bytes = limite_bytes
+        self.bytes_usados = 0
+        self.aciertos = 0
+        self.fallos = 0
+        self._figuras = OrderedDict()
+        self._lock = threading.Lock()
+
+    def obtener(self, clave):
+        with self._lock:
+            datos = self._figuras.get(clave)
+            if datos is None:
+                self.fallos += 1
+                return None
+            self._figuras.move_to_end(clave)
+            self.aciertos += 1
+            return datos
+
+    def guardar(self, clave, datos):
+        with self._lock:
+            if clave in self._figuras:
+                self.bytes_usados -= len(self._figuras.pop(clave))
+            # Una figura más grande que todo el presupuesto no se guarda
+            if len(datos) > self.limite_bytes:
+                return
+            self._figuras[clave] = datos
+            self.bytes_usados += len(datos)
+            while self.bytes_usados > self.limite_bytes:
+                _, viejo = self._figuras.popitem(last=False)
+                self.bytes_usados -= len(viejo)
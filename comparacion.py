@@ -0,0 +1,83 @@
+"""Modo comparación: N jugadores x M partidos.
+
+Las métricas salen de una sola agrupación vectorizada (jugador, partido) sobre
+los eventos. Los mapas de pases con recuperaciones y pérdidas se dibujan y
+rasterizan en un pool de procesos: cada tarea recibe solo las coordenadas de
+un jugador en un partido y devuelve los bytes PNG, así que los workers no
+necesitan los datos completos ni Streamlit.
+"""
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import agregados
+
+# Ancho de cada celda de la grilla (la figura se rasteriza a lo sumo a este ancho)
+ANCHO_CELDA_PX = 600
+MAX_WORKERS = 4
+
+
+def crear_pool(max_workers=None):
+    """Pool de procesos para rasterizar figuras.
+
+    Se usa ``spawn``: el proceso de Streamlit tiene hilos corriendo y un ``fork``
+    podría heredar locks tomados.
+    """
+    max_workers = max_workers or min(MAX_WORKERS, os.cpu_count() or 1)
+    return ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"))
+
+
+def tabla_comparacion(df, jugadores, partidos):
+    """Métricas por jugador y partido (una fila por combinación con eventos)."""
+    df = df[df["Player"].isin(jugadores) & df["Partido"].isin(partidos)]
+    tabla = agregados.conteos_jugadores(df, por=("Player", "Partido"))
+    tabla["total_pases"] = tabla["pases_correctos"] + tabla["pases_incorrectos"]
+    tabla["porcentaje_pases"] = (tabla["pases_correctos"] / tabla["total_pases"] * 100).fillna(0.0)
+    return tabla.drop(columns="partidos_jugados").rename_axis(["jugador", "partido"]).reset_index()
+
+
+def tareas_mapas(df, jugadores, partidos):
+    """Argumentos de ``dibujar_mapa`` para cada (jugador, partido), solo con las columnas que usa."""
+    df = df[df["Player"].isin(jugadores) & df["Partido"].isin(partidos)]
+    eventos = df[df["Event"].isin(["PB", "PM", "Recuperacion", "Perdida"])]
+    grupos = {
+        (str(jugador), str(partido)): grupo
+        for (jugador, partido), grupo in eventos.groupby(["Player", "Partido"], observed=True)
+    }
+    tareas = {}
+    for jugador in jugadores:
+        for partido in partidos:
+            grupo = grupos.get((jugador, partido))
+            if grupo is None:
+                continue
+            pases = grupo[grupo["Event"].isin(["PB", "PM"])].dropna(subset=["X", "Y", "X2", "Y2"])
+            puntos = grupo.dropna(subset=["X", "Y"])
+            tareas[jugador, partido] = (
+                pases[["Event", "X", "Y", "X2", "Y2"]].astype({"Event": str}),
+                puntos.loc[puntos["Event"] == "Recuperacion", ["X", "Y"]].to_numpy(float),
+                puntos.loc[puntos["Event"] == "Perdida", ["X", "Y"]].to_numpy(float),
+                f"{jugador} vs {partido}",
+            )
+    return tareas
+
+
+def dibujar_mapa(pases, recuperaciones, perdidas, titulo, ancho_max_px=ANCHO_CELDA_PX):
+    """Mapa de pases con recuperaciones (verde) y pérdidas (rojo), como bytes PNG.
+
+    Corre en los workers del pool: importa matplotlib con el backend sin pantalla.
+    """
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import graficos
+    from cache_figuras import rasterizar
+
+    return rasterizar(graficos.figura_mapa(pases, recuperaciones, perdidas, titulo), ancho_max_px=ancho_max_px)
+
+
+def dibujar_en_paralelo(pool, tareas):
+    """Genera ``(clave, png)`` a medida que los workers terminan cada tarea de ``tareas``."""
+    futuros = {pool.submit(dibujar_mapa, *args): clave for clave, args in tareas.items()}
+    for futuro in as_completed(futuros):
+        yield futuros[futuro], futuro.result()
@@ -0,0 +1,429 @@
+"""Carga de eventos de partido.
+
+Cada partido es un CSV separado por ``;`` con el esquema
+Team;Player;Event;Mins;Secs;X;Y;X2;Y2;recep;Result. El nombre del archivo
+define el rival (``sportivo italiano.csv`` -> ``Sportivo Italiano``); si
+empieza con la fecha (``2025-04-12 midland.csv``), esa fecha ordena los
+partidos en la temporada (tendencias, últimos partidos).
+
+Los CSV se pueden ingerir a un almacén columnar (Arrow IPC sin comprimir, una
+partición por partido) que la app lee con proyección de columnas y poda por
+``Partido``::
+
+    python datos.py [--origen DIR] [--destino DIR]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+import agregados
+
+DIRECTORIO_DATOS = Path(__file__).resolve().parent
+DIRECTORIO_ALMACEN = DIRECTORIO_DATOS / "almacen"
+MANIFIESTO = "manifiesto.json"
+
+COLUMNAS = ["Team", "Player", "Event", "Mins", "Secs", "X", "Y", "X2", "Y2", "recep", "Result"]
+COLUMNAS_COORD = ["X", "Y", "X2", "Y2"]
+COLUMNAS_TIEMPO = {"Mins": "Int16", "Secs": "Int8"}
+# Máximo válido de cada columna de tiempo (un partido con alargue y descuentos no pasa de 130 minutos)
+MAXIMOS_TIEMPO = {"Mins": 130, "Secs": 59}
+COLUMNAS_CATEGORICAS = ["Player", "Event", "Partido", "recep", "Result"]
+COLUMNAS_TEXTO = ["Team", "Player", "recep"]
+# Sube cuando cambia la normalización: el almacén se vuelve a ingerir completo
+ESQUEMA = 3
+
+# Vocabularios cerrados: Event y Result son categorías con este orden fijo (mismos códigos en todos
+# los partidos). Los eventos van en el orden en que más se usan, como en el formulario en vivo.
+EVENTOS = (
+    "PB", "PM", "Recuperacion", "Perdida", "Tiro", "Lateral", "Interceptacion", "Centro", "Falta",
+    "Falta recibida", "Corner", "TL", "Atajada", "Saque de arco", "DG", "OC", "Asistencia", "DP",
+    "Tiro recibido",
+)
+RESULTADOS = ("Si", "No", "Gol", "Arco", "Block", "Fuera", "Ganado", "Perdido")
+# Variantes que aparecen en las planillas (además se ignoran mayúsculas y espacios)
+SINONIMOS = {"Tiro libre": "TL"}
+TIPOS_FIJOS = {"Event": pd.CategoricalDtype(EVENTOS), "Result": pd.CategoricalDtype(RESULTADOS)}
+
+# Fecha opcional al principio del nombre del CSV: da el orden de los partidos en la temporada
+PATRON_FECHA = re.compile(r"^(\d{4}-\d{2}-\d{2})[ _]+(.+)$")
+
+# Hash por (ruta, mtime, tamaño): solo se vuelve a leer el archivo si cambió en disco
+_hashes = {}
+
+
+def descubrir_partidos(directorio=DIRECTORIO_DATOS):
+    """Devuelve los CSV de partidos del directorio en el orden de la temporada (ver ``orden_partido``)."""
+    return sorted(Path(directorio).glob("*.csv"), key=lambda r: orden_partido(nombre_partido(r), fecha_partido(r)))
+
+
+def _partes_archivo(ruta):
+    # "2025-04-12 midland.csv" -> ("2025-04-12", "midland"); sin fecha adelante -> (None, "midland")
+    coincidencia = PATRON_FECHA.match(Path(ruta).stem)
+    return coincidencia.groups() if coincidencia else (None, Path(ruta).stem)
+
+
+def nombre_partido(ruta):
+    return _partes_archivo(ruta)[1].title()
+
+
+def fecha_partido(ruta):
+    """Fecha ISO del partido si el nombre del CSV empieza con ella ("2025-04-12 midland.csv"), o ``None``."""
+    return _partes_archivo(ruta)[0]
+
+
+def orden_partido(nombre, fecha):
+    """Clave de orden de la temporada: primero los partidos sin fecha (por nombre), después por fecha."""
+    return (fecha or "", nombre)
+
+
+def slug(nombre):
+    """Nombre apto para carpetas y archivos ("Sportivo Italiano" -> "sportivo_italiano")."""
+    return re.sub(r"[^a-z0-9]+", "_", nombre.lower()).strip("_")
+
+
+def hash_archivo(ruta):
+    ruta = Path(ruta)
+    st = ruta.stat()
+    clave = (str(ruta), st.st_mtime_ns, st.st_size)
+    if clave not in _hashes:
+        _hashes[clave] = hashlib.sha1(ruta.read_bytes()).hexdigest()
+    return _hashes[clave]
+
+
+def firma_archivos(rutas):
+    """Firma hashable de un conjunto de archivos (nombre, mtime, hash).
+
+    Sirve como clave de cache: cambia si se agrega, quita o modifica un partido.
+    """
+    return tuple((Path(r).name, Path(r).stat().st_mtime_ns, hash_archivo(r)) for r in rutas)
+
+
+def leer_partido(ruta):
+    """Lee y valida un CSV de partido; devuelve ``(eventos, problemas)`` (ver ``normalizar_eventos``)."""
+    df = pd.read_csv(ruta, sep=";", dtype=str, keep_default_na=False, na_values=[""])
+    return normalizar_eventos(df, nombre_partido(ruta), Path(ruta).name)
+
+
+def _por_valor(valores, funcion):
+    """Aplica ``funcion`` una vez por valor distinto de la columna (no por fila); los faltantes quedan en None."""
+    codigos, unicos = pd.factorize(valores)
+    return np.array([funcion(v) for v in unicos] + [None], dtype=object)[codigos]
+
+
+def _canonico(valores, vocabulario):
+    """Valor canónico de cada texto (None si no está en el vocabulario), comparando sin mayúsculas ni espacios."""
+    claves = {v.casefold(): v for v in vocabulario}
+    claves.update({k.casefold(): v for k, v in SINONIMOS.items() if v in vocabulario})
+    return _por_valor(valores, lambda v: claves.get(v.strip().casefold()))
+
+
+def _numeros(valores):
+    """Valores como float (NaN si faltan o no son números) y máscara de los que no son números ni "-"."""
+    codigos, unicos = pd.factorize(valores)
+    numeros = pd.to_numeric(unicos, errors="coerce").astype("float64")
+    invalido = np.isnan(numeros) & np.array([v.strip() != "-" for v in unicos], dtype=bool)
+    return np.append(numeros, np.nan)[codigos], np.append(invalido, False)[codigos]
+
+
+def normalizar_eventos(df, partido, origen="eventos"):
+    """Valida los eventos como texto (CSV o registro en vivo) y los lleva al esquema con tipos compactos.
+
+    Se descartan las filas de encabezado repetidas y las de evento desconocido.
+    Resultados fuera del vocabulario, coordenadas no numéricas o fuera de 0-100 y
+    tiempos inválidos quedan en NaN. Devuelve ``(eventos, problemas)``, con un
+    texto por problema que indica la línea del archivo.
+    """
+    faltantes = [c for c in COLUMNAS if c not in df.columns]
+    if faltantes:
+        raise ValueError(f"{origen}: faltan columnas {', '.join(faltantes)}")
+    # Columnas como arreglos de objetos: cada operación de abajo es una sola llamada de numpy, no de pandas
+    df = {c: df[c].to_numpy(dtype=object, na_value=None) for c in COLUMNAS}
+    n = len(df["Event"])
+    problemas = []
+
+    def reportar(mascara, motivo, columna=None):
+        for i in np.flatnonzero(mascara):
+            detalle = f" {df[columna][i]!r}" if columna else ""
+            # Línea en el archivo: la 1 es el encabezado
+            problemas.append((i + 2, f"{origen}:{i + 2}: {motivo}{detalle}"))
+
+    # Cada columna de texto se resuelve por valor distinto: un partido tiene cientos de filas y pocas decenas de valores
+    encabezado = _por_valor(df["Event"], lambda v: v == "Event") == True  # noqa: E712 (None en los faltantes)
+    reportar(encabezado, "encabezado repetido")
+    evento = _canonico(df["Event"], EVENTOS)
+    desconocido = pd.isna(evento) & ~encabezado
+    reportar(desconocido, "evento desconocido", "Event")
+
+    limpio = {"Partido": partido}
+    for col in COLUMNAS_TEXTO:
+        limpio[col] = pd.array(_por_valor(df[col], str.strip), dtype="str")
+    limpio["Event"] = pd.Categorical(evento, dtype=TIPOS_FIJOS["Event"])
+    resultado = _canonico(df["Result"], RESULTADOS)
+    reportar(pd.isna(resultado) & ~pd.isna(df["Result"]) & ~encabezado, "resultado desconocido", "Result")
+    limpio["Result"] = pd.Categorical(resultado, dtype=TIPOS_FIJOS["Result"])
+
+    # "-" y vacío son "sin dato"; cualquier otro texto no numérico o fuera de la cancha se reporta
+    for col in COLUMNAS_COORD:
+        valores, invalido = _numeros(df[col])
+        reportar(invalido & ~encabezado, f"{col} no numérico", col)
+        with np.errstate(invalid="ignore"):
+            fuera = (valores < 0) | (valores > 100)
+        reportar(fuera, f"{col} fuera de 0-100", col)
+        limpio[col] = np.where(fuera, np.nan, valores).astype("float32")
+    for col, dtype in COLUMNAS_TIEMPO.items():
+        valores, invalido = _numeros(df[col])
+        reportar(invalido & ~encabezado, f"{col} no numérico", col)
+        # Antes de pasar a entero: un decimal se truncaría y un valor grande daría la vuelta en Int8
+        with np.errstate(invalid="ignore"):
+            fuera = ~np.isnan(valores) & ((valores != np.floor(valores)) | (valores < 0)
+                                          | (valores > MAXIMOS_TIEMPO[col]))
+        reportar(fuera, f"{col} fuera de 0-{MAXIMOS_TIEMPO[col]} o no entero", col)
+        limpio[col] = pd.array(np.where(fuera, np.nan, valores), dtype="Float64").astype(dtype)
+
+    validas = ~(encabezado | desconocido)
+    eventos = pd.DataFrame(limpio, index=pd.RangeIndex(n))[COLUMNAS + ["Partido"]][validas].reset_index(drop=True)
+    return eventos, [texto for _, texto in sorted(problemas)]
+
+
+def tipar_categorias(df, columnas=None):
+    for col in COLUMNAS_CATEGORICAS:
+        if columnas is None or col in columnas:
+            df[col] = df[col].astype(TIPOS_FIJOS.get(col, "category"))
+    return df
+
+
+def cargar_eventos(rutas, problemas=None):
+    """Lee y combina todos los partidos en un único DataFrame tipado (sin las filas inválidas).
+
+    Con ``problemas`` (un dict) se anotan ahí los de cada partido, de la misma lectura.
+    """
+    partidos = []
+    for ruta in rutas:
+        df, problemas_partido = leer_partido(ruta)
+        partidos.append(df)
+        if problemas is not None:
+            problemas[nombre_partido(ruta)] = problemas_partido
+    if not partidos:
+        return tipar_categorias(pd.DataFrame(columns=COLUMNAS + ["Partido"]))
+    # Las categorías se fijan después de concatenar para que todos los partidos compartan el mismo diccionario
+    return tipar_categorias(pd.concat(partidos, ignore_index=True))
+
+
+# --- Almacén columnar ---
+
+def _tabla_arrow(df):
+    # Diccionarios con índices int32 en todas las particiones para poder concatenarlas sin reindexar
+    tabla = pa.Table.from_pandas(df, preserve_index=False)
+    campos = [
+        pa.field(f.name, pa.dictionary(pa.int32(), pa.string())) if f.name in COLUMNAS_CATEGORICAS else f
+        for f in tabla.schema
+    ]
+    return tabla.cast(pa.schema(campos, metadata=tabla.schema.metadata))
+
+
+def _escribir_atomico(ruta, escribir):
+    tmp = ruta.with_name(ruta.name + ".tmp")
+    escribir(tmp)
+    os.replace(tmp, ruta)
+
+
+def leer_manifiesto(destino=DIRECTORIO_ALMACEN):
+    ruta = Path(destino) / MANIFIESTO
+    if not ruta.exists():
+        return None
+    return json.loads(ruta.read_text(encoding="utf-8"))
+
+
+def ingestar(origen=DIRECTORIO_DATOS, destino=DIRECTORIO_ALMACEN):
+    """Valida y normaliza cada CSV de ``origen`` en una partición de ``destino``.
+
+    Solo se reescriben los partidos cuyo CSV cambió (por hash); las particiones
+    de CSV eliminados se borran. Los totales de temporada se actualizan restando
+    los parciales viejos y sumando los nuevos de esos partidos, sin releer el resto.
+    Las filas con problemas (ver ``normalizar_eventos``) quedan anotadas en el
+    manifiesto. Devuelve ``{"escritos": [...], "sin_cambios": [...], "eliminados": [...]}``.
+    """
+    destino = Path(destino)
+    destino.mkdir(parents=True, exist_ok=True)
+    manifiesto = leer_manifiesto(destino) or {"partidos": {}}
+    # Con otro esquema de normalización las particiones viejas no sirven: se reescriben todas
+    anteriores = manifiesto["partidos"]
+    vigente = manifiesto.get("esquema") == ESQUEMA
+    partidos = {}
+    resumen = {"escritos": [], "sin_cambios": [], "eliminados": []}
+
+    totales = agregados.leer_temporada(destino)
+    # Sin totales guardados, o si los parciales a restar no son los del manifiesto (una ingesta que se
+    # cortó después de reescribirlos), los totales se reconstruyen desde los parciales al final
+    reconstruir = totales is None and bool(anteriores)
+
+    def restar_previo(previo):
+        nonlocal totales, reconstruir
+        parciales = agregados.leer_parciales((destino / previo["archivo"]).parent, previo["hash"])
+        if parciales is None:
+            reconstruir = True
+        elif not reconstruir:
+            totales = agregados.acumular(totales, parciales, -1)
+
+    for ruta in descubrir_partidos(origen):
+        nombre = nombre_partido(ruta)
+        h = hash_archivo(ruta)
+        previo = anteriores.get(nombre)
+        if vigente and previo and previo["hash"] == h and (destino / previo["archivo"]).exists():
+            # Renombrar el CSV (por ejemplo, para agregarle la fecha) no cambia los datos
+            partidos[nombre] = {**previo, "origen": ruta.name, "fecha": fecha_partido(ruta)}
+            resumen["sin_cambios"].append(nombre)
+            continue
+
+        if previo:
+            restar_previo(previo)
+        df, problemas_partido = leer_partido(ruta)
+        df = tipar_categorias(df)
+        archivo = f"Partido={slug(nombre)}/eventos.arrow"
+        (destino / archivo).parent.mkdir(exist_ok=True)
+        tabla = _tabla_arrow(df)
+        _escribir_atomico(destino / archivo, lambda tmp: _escribir_ipc(tabla, tmp))
+        parciales = agregados.conteos(df)
+        agregados.guardar_parciales((destino / archivo).parent, parciales, h)
+        if not reconstruir:
+            totales = agregados.acumular(totales, parciales)
+        partidos[nombre] = {
+            "archivo": archivo, "origen": ruta.name, "fecha": fecha_partido(ruta), "hash": h, "filas": len(df),
+            "problemas": problemas_partido,
+        }
+        resumen["escritos"].append(nombre)
+
+    for nombre, previo in anteriores.items():
+        if nombre not in partidos:
+            restar_previo(previo)
+            shutil.rmtree((destino / previo["archivo"]).parent, ignore_errors=True)
+            resumen["eliminados"].append(nombre)
+
+    if reconstruir:
+        totales = None
+        for nombre, entrada in partidos.items():
+            particion = (destino / entrada["archivo"]).parent
+            parciales = agregados.leer_parciales(particion, entrada["hash"])
+            if parciales is None:
+                parciales = agregados.conteos(leer_almacen(destino, [nombre], manifiesto={"partidos": partidos}))
+                agregados.guardar_parciales(particion, parciales, entrada["hash"])
+            totales = agregados.acumular(totales, parciales)
+    if totales is not None:
+        agregados.guardar_temporada(destino, totales)
+
+    manifiesto = {"esquema": ESQUEMA, "partidos": dict(sorted(partidos.items()))}
+    _escribir_atomico(
+        destino / MANIFIESTO,
+        lambda tmp: tmp.write_text(json.dumps(manifiesto, indent=2, ensure_ascii=False), encoding="utf-8"),
+    )
+    return resumen
+
+
+def _escribir_ipc(tabla, ruta):
+    # Sin compresión: el archivo se puede mapear en memoria y las sesiones comparten páginas
+    with pa.OSFile(str(ruta), "wb") as sink, pa.ipc.new_file(sink, tabla.schema) as writer:
+        writer.write_table(tabla)
+
+
+def leer_almacen(destino=DIRECTORIO_ALMACEN, partidos=None, columnas=None, manifiesto=None):
+    """Lee el almacén mapeando en memoria solo las particiones y columnas pedidas."""
+    destino = Path(destino)
+    manifiesto = manifiesto or leer_manifiesto(destino)
+    if manifiesto is None:
+        raise FileNotFoundError(f"No hay almacén en {destino}; correr `python datos.py` primero")
+    entradas = manifiesto["partidos"]
+    columnas = list(columnas) if columnas is not None else None
+    nombres = list(entradas) if partidos is None else [p for p in partidos if p in entradas]
+
+    tablas = []
+    for nombre in nombres:
+        tabla = pa.ipc.open_file(pa.memory_map(str(destino / entradas[nombre]["archivo"]))).read_all()
+        tablas.append(tabla.select(columnas) if columnas is not None else tabla)
+    if not tablas:
+        vacio = cargar_eventos([])
+        return vacio[columnas] if columnas is not None else vacio
+    return tipar_categorias(pa.concat_tables(tablas).to_pandas(), columnas)
+
+
+# --- Fuente de datos para la app ---
+
+def fuente_datos(origen=DIRECTORIO_DATOS, destino=DIRECTORIO_ALMACEN):
+    """Describe de dónde leer los eventos, como tupla hashable para usar de clave de cache.
+
+    Si hay almacén ingerido con el esquema actual se usa su manifiesto; si no, la firma de los CSV.
+    """
+    manifiesto = leer_manifiesto(destino)
+    if manifiesto is not None and manifiesto.get("esquema") == ESQUEMA:
+        entradas = sorted(manifiesto["partidos"].items(), key=lambda item: orden_partido(item[0], item[1].get("fecha")))
+        return ("almacen", str(destino), tuple((n, e["hash"]) for n, e in entradas))
+    rutas = descubrir_partidos(origen)
+    return ("csv", str(origen), tuple(zip((nombre_partido(r) for r in rutas), firma_archivos(rutas))))
+
+
+def partidos_disponibles(fuente):
+    """Nombres de los partidos de ``fuente`` en el orden de la temporada."""
+    return [nombre for nombre, _ in fuente[2]]
+
+
+def cargar(fuente, partidos=None, columnas=None, problemas=None):
+    """Carga los eventos de ``fuente`` (ver ``fuente_datos``), opcionalmente podados.
+
+    Con CSV y ``problemas`` (un dict), anota ahí los problemas de validación de los partidos leídos.
+    """
+    tipo, directorio, entradas = fuente
+    if tipo == "almacen":
+        return leer_almacen(directorio, partidos, list(columnas) if columnas is not None else None)
+    rutas = [Path(directorio) / firma[0] for nombre, firma in entradas if partidos is None or nombre in partidos]
+    return recortar(cargar_eventos(rutas, problemas), columnas=columnas)
+
+
+def recortar(df, partidos=None, columnas=None):
+    """Partidos y columnas de eventos ya cargados, como los devuelve ``leer_almacen`` con poda.
+
+    Las categorías de texto quedan solo con los valores presentes; Event y Result conservan las fijas.
+    """
+    if partidos is not None:
+        df = df[df["Partido"].isin(list(partidos))].reset_index(drop=True)
+        for col in COLUMNAS_CATEGORICAS:
+            if col not in TIPOS_FIJOS:
+                df[col] = df[col].cat.remove_unused_categories()
+    return df[list(columnas)] if columnas is not None else df
+
+
+def problemas(fuente):
+    """Problemas de validación de cada partido de ``fuente``: ``{partido: [texto, ...]}``.
+
+    Con CSV se vuelven a leer los archivos; si los eventos ya se cargaron, sirven los que anota ``cargar``.
+    """
+    tipo, directorio, entradas = fuente
+    if tipo == "almacen":
+        return {n: e.get("problemas", []) for n, e in leer_manifiesto(directorio)["partidos"].items()}
+    return {nombre: leer_partido(Path(directorio) / firma[0])[1] for nombre, firma in entradas}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingerir los CSV de partidos al almacén columnar.")
+    parser.add_argument("--origen", type=Path, default=DIRECTORIO_DATOS)
+    parser.add_argument("--destino", type=Path, default=DIRECTORIO_ALMACEN)
+    args = parser.parse_args()
+
+    resumen = ingestar(args.origen, args.destino)
+    for clave, nombres in resumen.items():
+        print(f"{clave}: {len(nombres)}" + (f" ({', '.join(nombres)})" if nombres else ""))
+    entradas = leer_manifiesto(args.destino)["partidos"]
+    for nombre in resumen["escritos"]:
+        for problema in entradas[nombre]["problemas"]:
+            print(f"  {problema}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+"""Carga de eventos en vivo, durante el partido.
+
+Cada evento se agrega como una línea al final de un registro con el mismo
+formato que los CSV de partido; al terminar, el archivo se mueve a la carpeta
+de datos y se ingiere como cualquier otro partido. Las escrituras van directo
+al archivo (no se pierden si se cae la app) y se sincronizan a disco con
+``fsync`` por tandas. Si una caída del sistema deja una línea a medias, se
+descarta al volver a abrir el registro.
+
+``EstadoEnVivo`` mantiene la red de pases, el conteo por zona y los
+contadores del partido; en cada actualización lee solo los bytes nuevos del
+registro y suma sus eventos, sin recargar el partido completo.
+"""
+
+import io
+import os
+import threading
+import time
+from datetime import date
+from pathlib import Path
+
+import networkx as nx
+import numpy as np
+import pandas as pd
+
+import agregados
+import datos
+import red_pases
+import zonas
+
+DIRECTORIO_EN_VIVO = datos.DIRECTORIO_DATOS / "en_vivo"
+EQUIPO = "Excursio"
+ENCABEZADO = ";".join(datos.COLUMNAS) + "\n"
+
+
+def ruta_partido(rival, directorio=DIRECTORIO_EN_VIVO):
+    # Mismo criterio de nombre que los CSV de partido ("Sportivo Italiano" -> "sportivo italiano.csv")
+    return Path(directorio) / f"{rival.strip().lower()}.csv"
+
+
+def partido_existente(rival, directorio=datos.DIRECTORIO_DATOS):
+    """CSV del directorio que ya es el partido ``rival`` (sin distinguir mayúsculas), o ``None``."""
+    nombre = rival.strip().casefold()
+    return next((r for r in datos.descubrir_partidos(directorio) if datos.nombre_partido(r).casefold() == nombre), None)
+
+
+def partidos_en_curso(directorio=DIRECTORIO_EN_VIVO):
+    return [datos.nombre_partido(r) for r in datos.descubrir_partidos(directorio)] if Path(directorio).exists() else []
+
+
+def _campo(valor, vacio=""):
+    if valor is None or (isinstance(valor, float) and np.isnan(valor)):
+        return vacio
+    if isinstance(valor, float) and valor.is_integer():
+        valor = int(valor)
+    # El separador y los saltos de línea romperían el registro
+    return str(valor).replace(";", ",").replace("\r", " ").replace("\n", " ")
+
+
+class Registro:
+    """Registro de solo agregado de un partido en vivo. Seguro entre hilos (sesiones)."""
+
+    def __init__(self, ruta, cada_eventos=20, cada_segundos=2.0):
+        self.ruta = Path(ruta)
+        self.cada_eventos = cada_eventos
+        self.cada_segundos = cada_segundos
+        self._lock = threading.Lock()
+        self.ruta.parent.mkdir(parents=True, exist_ok=True)
+        nuevo = not self.ruta.exists() or self.ruta.stat().st_size == 0
+        if not nuevo:
+            self._descartar_linea_cortada()
+        self._fd = os.open(self.ruta, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        self._pendientes = 0
+        self._ultimo_fsync = time.monotonic()
+        if nuevo:
+            os.write(self._fd, ENCABEZADO.encode("utf-8"))
+            os.fsync(self._fd)
+            # Que la entrada del archivo en el directorio también sobreviva a una caída
+            # (en Windows no se puede abrir un directorio para sincronizarlo)
+            if os.name != "nt":
+                fd_dir = os.open(self.ruta.parent, os.O_RDONLY)
+                try:
+                    os.fsync(fd_dir)
+                finally:
+                    os.close(fd_dir)
+
+    def _descartar_linea_cortada(self):
+        with open(self.ruta, "rb+") as f:
+            contenido = f.read()
+            fin = contenido.rfind(b"\n") + 1
+            if fin < len(contenido):
+                f.truncate(fin)
+                os.fsync(f.fileno())
+
+    def agregar(self, evento):
+        """Agrega un evento (dict con las columnas del CSV; las coordenadas faltantes quedan en "-")."""
+        campos = [
+            _campo(evento.get(c), "-" if c in datos.COLUMNAS_COORD else "")
+            for c in datos.COLUMNAS
+        ]
+        linea = (";".join(campos) + "\n").encode("utf-8")
+        with self._lock:
+            # Una sola escritura por línea con O_APPEND: no se intercalan líneas de otras sesiones
+            os.write(self._fd, linea)
+            self._pendientes += 1
+            if self._pendientes >= self.cada_eventos:
+                self._sincronizar()
+
+    def sincronizar(self, solo_si_vencio=False):
+        """``fsync`` de lo pendiente; con ``solo_si_vencio`` solo si pasaron ``cada_segundos`` desde el último."""
+        with self._lock:
+            if self._pendientes and (not solo_si_vencio
+                                     or time.monotonic() - self._ultimo_fsync >= self.cada_segundos):
+                self._sincronizar()
+
+    def _sincronizar(self):
+        os.fsync(self._fd)
+        self._pendientes = 0
+        self._ultimo_fsync = time.monotonic()
+
+    def leer_desde(self, offset):
+        """Texto de las líneas completas a partir del byte ``offset`` y el offset siguiente."""
+        with open(self.ruta, "rb") as f:
+            f.seek(offset)
+            nuevo = f.read()
+        fin = nuevo.rfind(b"\n") + 1
+        return nuevo[:fin].decode("utf-8"), offset + fin
+
+    def cerrar(self):
+        with self._lock:
+            if self._fd is not None:
+                os.fsync(self._fd)
+                os.close(self._fd)
+                self._fd = None
+
+
+class EstadoEnVivo:
+    """Red de pases, pases por zona y contadores de un partido, actualizados con los eventos nuevos."""
+
+    def __init__(self, partido):
+        self.partido = partido
+        self.offset = 0
+        self.eventos = 0
+        # Cambia solo cuando llegan pases completados (la red y el mapa de calor dependen solo de ellos)
+        self.version_pases = 0
+        self.red = nx.DiGraph()
+        self.totales = None
+        self._pases = []
+        self._conteos_zona = {}
+        self._lock = threading.Lock()
+
+    def actualizar(self, registro):
+        """Lee y suma los eventos agregados desde la última actualización; devuelve cuántos hubo."""
+        with self._lock:
+            texto, offset = registro.leer_desde(self.offset)
+            if self.offset == 0:
+                # Salteo del encabezado
+                texto = texto.partition("\n")[2]
+            self.offset = offset
+            if not texto:
+                return 0
+            crudo = pd.read_csv(io.StringIO(ENCABEZADO + texto), sep=";", dtype=str,
+                                keep_default_na=False, na_values=[""])
+            # El formulario solo ofrece valores del vocabulario: no se esperan problemas de validación
+            nuevos, _ = datos.normalizar_eventos(crudo, self.partido, registro.ruta.name)
+            self._sumar(nuevos)
+            return len(nuevos)
+
+    def _sumar(self, nuevos):
+        self.eventos += len(nuevos)
+        self.totales = agregados.acumular(self.totales, agregados.conteos(nuevos))
+        # Los conteos son aditivos entre tandas, pero todas son del mismo partido
+        self.totales["jugadores"]["partidos_jugados"] = self.totales["jugadores"]["partidos_jugados"].clip(upper=1)
+        pases = nuevos[nuevos["Event"] == "PB"].dropna(subset=["X", "Y", "X2", "Y2"])
+        if pases.empty:
+            return
+        self.version_pases += 1
+        red_pases.acumular_red(self.red, red_pases.construir_red(pases))
+        inicio = pases[["X", "Y"]].to_numpy(float)
+        self._pases.append(inicio)
+        for rejilla, conteo in self._conteos_zona.items():
+            conteo += zonas.conteo_por_zona(zonas.asignar_zonas(inicio[:, 0], inicio[:, 1], rejilla), rejilla)
+
+    def conteo_por_zona(self, rejilla):
+        """Pases completados por zona de inicio; una rejilla nueva se cuenta una vez y después se actualiza sola."""
+        with self._lock:
+            if rejilla not in self._conteos_zona:
+                inicio = np.concatenate(self._pases) if self._pases else np.empty((0, 2))
+                self._conteos_zona[rejilla] = zonas.conteo_por_zona(
+                    zonas.asignar_zonas(inicio[:, 0], inicio[:, 1], rejilla), rejilla
+                )
+            return self._conteos_zona[rejilla].copy()
+
+    def red_orientada(self):
+        """Posiciones y conexiones de la red hasta ahora, listas para ``graficos.figura_red``."""
+        with self._lock:
+            pos = red_pases.posiciones(self.red)
+            return red_pases.orientar(pos, red_pases.aristas(self.red, pos))[:2]
+
+    def estadisticas(self):
+        """Tabla jugador x métrica del partido hasta ahora (ver ``agregados.completar_estadisticas``)."""
+        with self._lock:
+            if self.totales is None:
+                conteos = pd.DataFrame(columns=agregados.METRICAS, dtype="int64").rename_axis("Player")
+            else:
+                conteos = self.totales["jugadores"]
+            return agregados.completar_estadisticas(conteos)
+
+
+def cerrar_partido(registro, destino=datos.DIRECTORIO_DATOS):
+    """Cierra el registro y lo mueve a la carpeta de partidos (queda listo para ``python datos.py``)."""
+    # Antes de cerrar: si el partido ya existe, el registro sigue abierto para seguir cargando
+    existente = partido_existente(datos.nombre_partido(registro.ruta), destino)
+    if existente is not None:
+        raise FileExistsError(f"Ya existe un partido en {existente}")
+    # Con la fecha adelante, el partido queda en su lugar de la temporada
+    final = Path(destino) / f"{date.today().isoformat()} {registro.ruta.name}"
+    registro.cerrar()
+    os.replace(registro.ruta, final)
+    return final
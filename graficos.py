@@ -0,0 +1,119 @@
+"""Dibujo de pases y redes sobre la cancha (coordenadas Opta 0-100).
+
+Cada capa se dibuja con una sola llamada vectorizada por categoría: una
+flecha o línea por fila dentro del mismo artista de matplotlib, en lugar de
+un artista por pase.
+"""
+
+import numpy as np
+from matplotlib.colors import to_rgba
+
+# Color y opacidad por tipo de pase (menos opacidad en los malos)
+ESTILO_PASES = {"PB": ("green", 0.6), "PM": ("red", 0.2)}
+
+
+def invertir_y(y):
+    """Invierte arriba/abajo para que la cancha quede orientada como en el video."""
+    return 100 - np.asarray(y, dtype=float)
+
+
+def dibujar_pases(pases, ax, pitch):
+    """Flechas de inicio a fin de cada pase, una llamada por tipo (PB/PM)."""
+    for evento, (color, alpha) in ESTILO_PASES.items():
+        sel = pases[pases["Event"] == evento]
+        if sel.empty:
+            continue
+        colores = np.tile(to_rgba(color, alpha), (len(sel), 1))
+        pitch.arrows(
+            sel["X"].to_numpy(float), invertir_y(sel["Y"]),
+            sel["X2"].to_numpy(float), invertir_y(sel["Y2"]),
+            color=colores, width=2, headwidth=4, headlength=5, ax=ax
+        )
+
+
+def dibujar_conexiones(pass_counts, ax, pitch, color, max_line_width=10, min_transparency=0.1):
+    """Líneas de la red de pases en una sola colección.
+
+    El ancho y la opacidad de cada línea son proporcionales a ``pass_count``.
+    """
+    if pass_counts.empty:
+        return
+    proporcion = (pass_counts["pass_count"] / pass_counts["pass_count"].max()).to_numpy(float)
+    colores = np.tile(to_rgba(color), (len(pass_counts), 1))
+    colores[:, 3] = proporcion * (1 - min_transparency) + min_transparency
+    pitch.lines(
+        pass_counts["X"].to_numpy(float), pass_counts["Y"].to_numpy(float),
+        pass_counts["X_end"].to_numpy(float), pass_counts["Y_end"].to_numpy(float),
+        ax=ax, color=colores, linewidth=proporcion * max_line_width, zorder=2
+    )
+
+
+def figura_mapa(pases, recuperaciones, perdidas, titulo=None):
+    """Mapa de pases de un jugador con sus recuperaciones (verde) y pérdidas (rojo) (arreglos ``n x 2`` de X, Y)."""
+    from mplsoccer import Pitch
+
+    pitch = Pitch(pitch_type="opta")
+    fig, ax = pitch.draw(figsize=(6, 4))
+    dibujar_pases(pases, ax, pitch)
+    pitch.scatter(recuperaciones[:, 0], invertir_y(recuperaciones[:, 1]),
+                  c="green", s=15, linewidth=0.8, alpha=0.3, ax=ax)
+    pitch.scatter(perdidas[:, 0], invertir_y(perdidas[:, 1]),
+                  c="red", s=15, linewidth=0.8, alpha=0.2, ax=ax)
+    if titulo:
+        ax.set_title(titulo, fontsize=12)
+    return fig
+
+
+def figura_red(pos, conexiones, color="green", max_line_width=10, max_marker_size=500, min_transparency=0.1):
+    """Cancha con la red de pases (``pos``/``conexiones`` ya orientadas, ver ``red_pases.orientar``)."""
+    from mplsoccer import Pitch
+
+    pitch = Pitch(pitch_type="opta", line_color="black", pitch_color="white")
+    fig, ax = pitch.draw(figsize=(12, 8), constrained_layout=False, tight_layout=True)
+    fig.patch.set_facecolor("white")
+    ax.set_facecolor("white")
+
+    # Conexiones (una sola colección de líneas)
+    dibujar_conexiones(conexiones, ax, pitch, color, max_line_width=max_line_width, min_transparency=min_transparency)
+
+    # Nodos, con tamaño proporcional a los pases
+    tamanos = pos["count"] / pos["count"].max() * max_marker_size
+    pitch.scatter(pos.X, pos.Y, ax=ax, color="black", ec="white", s=tamanos, zorder=3)
+    for _, r in pos.iterrows():
+        ax.text(
+            r.X, r.Y + 2.5, r.Player,
+            color="black", ha="center",
+            fontsize=10, fontweight="bold", zorder=4,
+            bbox=dict(facecolor="white", edgecolor="black", boxstyle="round,pad=0.3")
+        )
+    return fig
+
+
+def figura_heatmap(conteo, bordes_x, bordes_y):
+    """Cancha con el conteo por zona (matriz ``n_x x n_y``, ver ``zonas.conteo_por_zona``)."""
+    from mplsoccer import Pitch
+
+    pitch = Pitch(pitch_type="opta", line_color="black", pitch_color="white")
+    fig, ax = pitch.draw(figsize=(8, 6))
+    pcm = ax.pcolormesh(bordes_x, bordes_y, conteo.T, cmap="Greens", alpha=0.5)
+    fig.colorbar(pcm, ax=ax, shrink=0.7, label="Cantidad de pases")
+    return fig
+
+
+def figura_ficha(jugador, temporada, partidos):
+    """Ficha de un jugador: métricas de la temporada (``{etiqueta: valor}``) y una tabla por partido."""
+    import matplotlib.pyplot as plt
+
+    alto = 2.2 + 0.3 * (len(temporada) + len(partidos))
+    fig, (ax_temporada, ax_partidos) = plt.subplots(
+        2, 1, figsize=(8, alto), gridspec_kw={"height_ratios": [len(temporada) + 1, len(partidos) + 1]}
+    )
+    fig.suptitle(jugador, fontsize=16, fontweight="bold")
+    for ax in (ax_temporada, ax_partidos):
+        ax.axis("off")
+    ax_temporada.table(cellText=[[k, str(v)] for k, v in temporada.items()], colLabels=["Temporada", ""],
+                       loc="center", cellLoc="left")
+    if len(partidos):
+        ax_partidos.table(cellText=partidos.astype(str).to_numpy().tolist(), colLabels=list(partidos.columns),
+                          loc="center", cellLoc="center")
+    return fig
@@ -0,0 +1,121 @@
+"""Índice espacial de eventos (coordenadas Opta 0-100).
+
+Los puntos de inicio (X, Y) y de fin (X2, Y2) se ordenan por celda de una
+rejilla fina (cubetas). Cada celda queda en un tramo contiguo del arreglo
+ordenado. Una consulta de rectángulo toma un tramo por columna de celdas y
+solo compara coordenadas exactas de esos candidatos, sin recorrer todo el
+DataFrame. Las consultas devuelven posiciones de fila (para ``df.iloc``) del
+DataFrame con el que se construyó el índice, sin un orden en particular.
+"""
+
+import numpy as np
+
+CELDAS = 50
+
+
+class Cubetas:
+    """Puntos ordenados por celda de una rejilla ``celdas x celdas`` sobre 0-100."""
+
+    def __init__(self, x, y, celdas=CELDAS, fin=None):
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        self.celdas = celdas
+        filas = np.flatnonzero(~(np.isnan(x) | np.isnan(y)))
+        codigos = self._celda(x[filas]) * celdas + self._celda(y[filas])
+        orden = np.argsort(codigos, kind="stable")
+        self.filas = filas[orden]
+        self.x = x[self.filas]
+        self.y = y[self.filas]
+        # Opcional: el otro extremo (X2, Y2) en el mismo orden, para filtrar corredores con lecturas contiguas
+        self.fin = None if fin is None else tuple(np.asarray(v, dtype=float)[self.filas] for v in fin)
+        # inicios[c]:inicios[c + 1] es el tramo de la celda c en el orden
+        self.inicios = np.zeros(celdas * celdas + 1, dtype=np.int64)
+        np.cumsum(np.bincount(codigos, minlength=celdas * celdas), out=self.inicios[1:])
+
+    def __len__(self):
+        return len(self.filas)
+
+    def _celda(self, valores):
+        # Lo que cae fuera de 0-100 va a las celdas del borde (la comparación exacta lo descarta si corresponde)
+        return np.clip((np.asarray(valores, dtype=float) * (self.celdas / 100)).astype(np.int64), 0, self.celdas - 1)
+
+    def _tramos(self, columnas, iy0, iy1):
+        """Posiciones de las celdas (ix, iy0..iy1) de cada columna ``ix``, un tramo contiguo por columna."""
+        base = np.asarray(columnas, dtype=np.int64) * self.celdas
+        if len(base) == 0 or iy1 < iy0:
+            return np.empty(0, dtype=np.int64)
+        desde = self.inicios[base + iy0]
+        largos = self.inicios[base + iy1 + 1] - desde
+        return np.repeat(desde - np.cumsum(largos) + largos, largos) + np.arange(largos.sum())
+
+    def rectangulo(self, x0, x1, y0, y1):
+        """Posiciones (en el orden de las cubetas) de los puntos con x0 <= X <= x1 e y0 <= Y <= y1."""
+        if x0 > x1 or y0 > y1:
+            return np.empty(0, dtype=np.int64)
+        ix0, ix1, iy0, iy1 = (int(c) for c in self._celda([x0, x1, y0, y1]))
+        interiores = np.arange(ix0 + 1, ix1)
+        # Las celdas interiores están enteras dentro del rectángulo; solo las del borde se comparan
+        seguras = self._tramos(interiores, iy0 + 1, iy1 - 1)
+        borde = np.concatenate([
+            self._tramos(sorted({ix0, ix1}), iy0, iy1),
+            self._tramos(interiores, iy0, iy0),
+            self._tramos(interiores, iy1, iy1) if iy1 > iy0 else np.empty(0, dtype=np.int64),
+        ])
+        x, y = self.x[borde], self.y[borde]
+        return np.concatenate([seguras, borde[(x >= x0) & (x <= x1) & (y >= y0) & (y <= y1)]])
+
+
+class IndiceEspacial:
+    """Cubetas sobre el inicio (X, Y) y el fin (X2, Y2) de cada evento de ``df``.
+
+    ``extremo`` es ``"inicio"`` o ``"fin"``, como en ``zonas.zonificar``.
+    """
+
+    def __init__(self, df, celdas=CELDAS):
+        self.n_filas = len(df)
+        self.cubetas = {
+            "inicio": Cubetas(df["X"], df["Y"], celdas, fin=(df["X2"], df["Y2"])),
+            "fin": Cubetas(df["X2"], df["Y2"], celdas),
+        }
+
+    def rectangulo(self, x0, x1, y0, y1, extremo="inicio"):
+        """Filas con el ``extremo`` dentro del rectángulo (bordes incluidos)."""
+        cubetas = self.cubetas[extremo]
+        return cubetas.filas[cubetas.rectangulo(x0, x1, y0, y1)]
+
+    def radio(self, x, y, r, extremo="inicio"):
+        """Filas con el ``extremo`` a distancia <= ``r`` de (x, y)."""
+        cubetas = self.cubetas[extremo]
+        idx = cubetas.rectangulo(x - r, x + r, y - r, y + r)
+        dentro = (cubetas.x[idx] - x) ** 2 + (cubetas.y[idx] - y) ** 2 <= r * r
+        return cubetas.filas[idx[dentro]]
+
+    def zona(self, codigo, rejilla, extremo="inicio"):
+        """Filas con el ``extremo`` en la zona ``codigo`` de ``rejilla`` (mismo criterio que ``zonas.asignar_zonas``)."""
+        return self.rectangulo(*_limites_zona(codigo, rejilla), extremo=extremo)
+
+    def corredor(self, origen, destino):
+        """Filas que empiezan en el rectángulo ``origen`` y terminan en ``destino`` (``(x0, x1, y0, y1)``)."""
+        cubetas = self.cubetas["inicio"]
+        idx = cubetas.rectangulo(*origen)
+        x0, x1, y0, y1 = destino
+        x2, y2 = cubetas.fin[0][idx], cubetas.fin[1][idx]
+        return cubetas.filas[idx[(x2 >= x0) & (x2 <= x1) & (y2 >= y0) & (y2 <= y1)]]
+
+    def corredor_zonas(self, origen, destino, rejilla):
+        """Filas que van de la zona ``origen`` a la zona ``destino`` de ``rejilla``."""
+        return self.corredor(_limites_zona(origen, rejilla), _limites_zona(destino, rejilla))
+
+
+def _limites_zona(codigo, rejilla):
+    """Rectángulo (x0, x1, y0, y1) de la zona, con bordes incluidos.
+
+    Como en ``np.digitize``, un punto sobre un borde interior es de la zona siguiente:
+    el borde superior de cada zona (salvo la última) se corre al float anterior.
+    """
+    ix, iy = divmod(codigo, rejilla.forma[1])
+    limites = []
+    for bordes, i in ((rejilla.bordes_x, ix), (rejilla.bordes_y, iy)):
+        fin = bordes[i + 1] if i + 1 == len(bordes) - 1 else np.nextafter(bordes[i + 1], -np.inf)
+        limites += [bordes[i], fin]
+    return tuple(limites)
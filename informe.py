@@ -0,0 +1,185 @@
+"""Informe de temporada sin interfaz: todas las figuras de la app a PNG/PDF.
+
+Por partido: red de pases y mapa de calor zonal (como en "Análisis de
+equipo"). Por jugador: mapa de pases con recuperaciones y pérdidas de cada
+partido (como en "Comparación") y una ficha con sus estadísticas. Usa los
+mismos módulos que ``pro_stream.py``, dibuja con el backend Agg en un pool de
+procesos y saltea las figuras cuyos datos de entrada no cambiaron (huella de
+contenido guardada en un manifiesto)::
+
+    python informe.py SALIDA [--formatos png pdf] [--procesos 4] [--rejilla 3x3] [--forzar]
+"""
+
+import argparse
+import hashlib
+import json
+import time
+from concurrent.futures import as_completed
+from pathlib import Path
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+import agregados  # noqa: E402
+import comparacion  # noqa: E402
+import datos  # noqa: E402
+import graficos  # noqa: E402
+import red_pases  # noqa: E402
+import zonas  # noqa: E402
+
+MANIFIESTO = "manifiesto_informe.json"
+# Subir al cambiar el dibujo de alguna figura: invalida todo lo generado antes
+VERSION = 1
+
+
+def _huella(*partes):
+    """Hash del contenido de las entradas de una figura (DataFrames, arreglos y valores simples)."""
+    h = hashlib.sha1(str(VERSION).encode())
+    for parte in partes:
+        if isinstance(parte, pd.DataFrame):
+            h.update(",".join(map(str, parte.columns)).encode())
+            h.update(pd.util.hash_pandas_object(parte, index=False).to_numpy().tobytes())
+        elif isinstance(parte, np.ndarray):
+            h.update(np.ascontiguousarray(parte).tobytes())
+        else:
+            h.update(repr(parte).encode())
+    return h.hexdigest()
+
+
+def trabajos_partido(df_partido, rejilla):
+    """Red de pases y mapa de calor de un partido, con la misma orientación que la página de equipo."""
+    pases = df_partido[df_partido["Event"] == "PB"].dropna(subset=["X", "Y", "X2", "Y2"])
+    if pases.empty:
+        return {}
+    red = red_pases.construir_red(pases)
+    pos = red_pases.posiciones(red)
+    pos, conexiones, espejado = red_pases.orientar(pos, red_pases.aristas(red, pos))
+    if espejado:
+        pases = pases.assign(**{c: 100 - pases[c] for c in datos.COLUMNAS_COORD})
+    conteo = zonas.conteo_por_zona(zonas.zonificar(pases, rejilla)["inicio"], rejilla)
+    return {
+        "red": (graficos.figura_red, (pos, conexiones, "green")),
+        f"heatmap_{rejilla.nombre}": (graficos.figura_heatmap, (conteo, rejilla.bordes_x, rejilla.bordes_y)),
+    }
+
+
+def ficha(stats, tabla_partidos):
+    """Argumentos de ``graficos.figura_ficha`` para una fila de ``agregados.estadisticas_jugadores``."""
+    temporada = {
+        "Partidos jugados": int(stats["partidos_jugados"]),
+        "Pases": f"{int(stats['pases_correctos'])}/{int(stats['total_pases'])} ({stats['porcentaje_pases']:.1f}%)",
+        "Tiros": f"{int(stats['tiros_al_arco'])}/{int(stats['total_tiros'])}",
+        "Goles": int(stats["goles"]),
+        "Pelotas recuperadas": int(stats["pelotas_recuperadas"]),
+        "Pelotas perdidas": int(stats["pelotas_perdidas"]),
+        "Faltas realizadas / recibidas": f"{int(stats['faltas_realizadas'])}/{int(stats['faltas_recibidas'])}",
+    }
+    partidos = pd.DataFrame({
+        "Partido": tabla_partidos["partido"],
+        "Pases": tabla_partidos["pases_correctos"].astype(str) + "/" + tabla_partidos["total_pases"].astype(str),
+        "Recup.": tabla_partidos["pelotas_recuperadas"],
+        "Pérd.": tabla_partidos["pelotas_perdidas"],
+        "Tiros": tabla_partidos["total_tiros"],
+        "Goles": tabla_partidos["goles"],
+    })
+    return stats["jugador"], temporada, partidos
+
+
+def planificar(df, rejilla):
+    """Todas las figuras del informe: ``{ruta relativa sin extensión: (función, argumentos)}``."""
+    trabajos = {}
+    partidos = sorted(df["Partido"].astype(str).unique())
+    for partido in partidos:
+        for nombre, trabajo in trabajos_partido(df[df["Partido"] == partido], rejilla).items():
+            trabajos[f"partidos/{datos.slug(partido)}/{nombre}"] = trabajo
+
+    stats = agregados.estadisticas_jugadores(df)
+    jugadores = sorted(stats["jugador"])
+    for (jugador, partido), args in comparacion.tareas_mapas(df, jugadores, partidos).items():
+        trabajos[f"jugadores/{datos.slug(jugador)}/{datos.slug(partido)}"] = (graficos.figura_mapa, args)
+    tabla = comparacion.tabla_comparacion(df, jugadores, partidos)
+    for _, fila in stats.iterrows():
+        por_partido = tabla[tabla["jugador"] == fila["jugador"]]
+        trabajos[f"jugadores/{datos.slug(fila['jugador'])}/ficha"] = (graficos.figura_ficha, ficha(fila, por_partido))
+    return trabajos
+
+
+def dibujar(funcion, args, base, formatos):
+    """Dibuja una figura y la guarda en cada formato (corre en los workers)."""
+    import matplotlib.pyplot as plt
+
+    base = Path(base)
+    base.parent.mkdir(parents=True, exist_ok=True)
+    fig = funcion(*args)
+    try:
+        for formato in formatos:
+            fig.savefig(base.with_suffix("." + formato), format=formato, dpi=150, bbox_inches="tight")
+    finally:
+        plt.close(fig)
+    return len(formatos)
+
+
+def generar(salida, fuente, formatos=("png",), procesos=None, rejilla=zonas.REJILLAS["3x3"], forzar=False):
+    """Genera el informe en ``salida``; devuelve ``{"figuras", "sin_cambios", "segundos"}``."""
+    salida = Path(salida)
+    salida.mkdir(parents=True, exist_ok=True)
+    ruta_manifiesto = salida / MANIFIESTO
+    anterior = {} if forzar or not ruta_manifiesto.exists() else json.loads(ruta_manifiesto.read_text(encoding="utf-8"))
+
+    inicio = time.perf_counter()
+    trabajos = planificar(datos.cargar(fuente), rejilla)
+    manifiesto, pendientes = {}, {}
+    for ruta, (funcion, args) in trabajos.items():
+        huella = _huella(funcion.__name__, formatos, *args)
+        manifiesto[ruta] = huella
+        existen = all((salida / ruta).with_suffix("." + f).exists() for f in formatos)
+        if anterior.get(ruta) != huella or not existen:
+            pendientes[ruta] = (funcion, args)
+
+    figuras = 0
+    if pendientes:
+        with comparacion.crear_pool(procesos) as pool:
+            futuros = {
+                pool.submit(dibujar, funcion, args, salida / ruta, formatos): ruta
+                for ruta, (funcion, args) in pendientes.items()
+            }
+            for futuro in as_completed(futuros):
+                futuro.result()
+                figuras += 1
+
+    # El manifiesto se escribe al final: si algo falla, lo pendiente se vuelve a intentar
+    tmp = ruta_manifiesto.with_name(ruta_manifiesto.name + ".tmp")
+    tmp.write_text(json.dumps(manifiesto, indent=2, sort_keys=True), encoding="utf-8")
+    tmp.replace(ruta_manifiesto)
+    return {
+        "figuras": figuras,
+        "sin_cambios": len(trabajos) - len(pendientes),
+        "segundos": time.perf_counter() - inicio,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generar las figuras de toda la temporada a PNG/PDF.")
+    parser.add_argument("salida", type=Path)
+    parser.add_argument("--formatos", nargs="+", default=["png"], choices=["png", "pdf", "svg"])
+    parser.add_argument("--procesos", type=int, help="workers del pool (por defecto hasta 4)")
+    parser.add_argument("--rejilla", default="3x3", choices=list(zonas.REJILLAS))
+    parser.add_argument("--origen", type=Path, default=datos.DIRECTORIO_DATOS)
+    parser.add_argument("--almacen", type=Path, default=datos.DIRECTORIO_ALMACEN)
+    parser.add_argument("--forzar", action="store_true", help="regenerar aunque los datos no hayan cambiado")
+    args = parser.parse_args()
+
+    fuente = datos.fuente_datos(args.origen, args.almacen)
+    resultado = generar(args.salida, fuente, tuple(args.formatos), args.procesos,
+                        zonas.REJILLAS[args.rejilla], args.forzar)
+    por_segundo = resultado["figuras"] / resultado["segundos"] if resultado["segundos"] else 0.0
+    print(f"{resultado['figuras']} figuras en {resultado['segundos']:.1f} s ({por_segundo:.1f} figuras/s), "
+          f"{resultado['sin_cambios']} sin cambios")
+
+
+if __name__ == "__main__":
+    main()
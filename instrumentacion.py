@@ -0,0 +1,124 @@
+"""Medición liviana de tiempos por etapa de cada render.
+
+Uso::
+
+    instrumentacion.iniciar(activo=True)          # al principio de cada rerun
+    with instrumentacion.tramo("carga", cache=True) as t:
+        df = cargar_datos(...)                    # dentro de la función cacheada: marcar_fallo()
+        t.filas = len(df)
+
+Cada sesión de Streamlit corre en su propio hilo, así que los tramos se
+guardan por hilo. Con la medición apagada ``tramo`` devuelve siempre el mismo
+objeto nulo: no mide, no asigna memoria y no guarda nada.
+"""
+
+import json
+import threading
+import time
+from functools import wraps
+
+_estado = threading.local()
+
+
+class _Tramo:
+    __slots__ = ("nombre", "nivel", "filas", "cache", "inicio", "segundos")
+
+    def __init__(self, nombre, nivel, filas, cache):
+        self.nombre = nombre
+        self.nivel = nivel
+        self.filas = filas
+        # None: no aplica; True: se espera un acierto salvo que se marque un fallo
+        self.cache = cache or None
+        self.segundos = None
+
+    def __enter__(self):
+        _estado.pila.append(self)
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.segundos = time.perf_counter() - self.inicio
+        _estado.pila.pop()
+        if self.cache is True:
+            self.cache = "hit"
+        return False
+
+    def como_dict(self):
+        return {"tramo": self.nombre, "nivel": self.nivel, "segundos": self.segundos,
+                "filas": self.filas, "cache": self.cache}
+
+
+class _TramoNulo:
+    __slots__ = ()
+    filas = None
+    cache = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __setattr__(self, nombre, valor):
+        pass
+
+
+_NULO = _TramoNulo()
+
+
+def iniciar(activo):
+    """Empieza la medición de un rerun (descarta los tramos anteriores del hilo)."""
+    _estado.activo = activo
+    _estado.tramos = []
+    _estado.pila = []
+
+
+def activo():
+    return getattr(_estado, "activo", False)
+
+
+def tramo(nombre, filas=None, cache=False):
+    """Context manager que mide ``nombre``; con ``cache=True`` registra hit/miss."""
+    if not getattr(_estado, "activo", False):
+        return _NULO
+    t = _Tramo(nombre, len(_estado.pila), filas, cache)
+    _estado.tramos.append(t)
+    return t
+
+
+def medido(nombre=None):
+    """Decorador equivalente a envolver la función en ``tramo``."""
+    def decorador(funcion):
+        etiqueta = nombre or funcion.__name__
+
+        @wraps(funcion)
+        def envoltura(*args, **kwargs):
+            if not getattr(_estado, "activo", False):
+                return funcion(*args, **kwargs)
+            with tramo(etiqueta):
+                return funcion(*args, **kwargs)
+        return envoltura
+    return decorador
+
+
+def marcar_fallo():
+    """Marca como miss los tramos abiertos que esperan cache (llamar desde el cuerpo de la función cacheada)."""
+    if not getattr(_estado, "activo", False):
+        return
+    for t in _estado.pila:
+        if t.cache is True:
+            t.cache = "miss"
+
+
+def tramos():
+    """Tramos del rerun actual, en orden de inicio."""
+    if not getattr(_estado, "activo", False):
+        return []
+    return [t.como_dict() for t in _estado.tramos]
+
+
+def escribir_log(ruta, **contexto):
+    """Agrega una línea JSON con el contexto (página, etc.) y los tramos del rerun."""
+    registro = {"fecha": time.strftime("%Y-%m-%dT%H:%M:%S"), **contexto, "tramos": tramos()}
+    with open(ruta, "a", encoding="utf-8") as f:
+        f.write(json.dumps(registro, ensure_ascii=False) + "\n")
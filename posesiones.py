@@ -0,0 +1,167 @@
+"""Reconstrucción de posesiones a partir de la secuencia de eventos.
+
+Los eventos se ordenan por partido, tiempo de juego y reloj (Mins/Secs). El
+reloj vuelve a cero en cada tiempo: un salto grande hacia atrás en el orden
+del registro abre un tiempo nuevo, y dentro de cada tiempo solo se corrigen
+las inversiones locales. Después se cortan en posesiones en una sola pasada
+lineal: una posesión termina con el evento que la corta (``FIN``: pase
+errado, pérdida, tiro, falta, lateral, ...) y una nueva empieza con una
+recuperación o intercepción (``INICIO``), después de un corte o al cambiar de
+partido.
+
+Las posesiones se guardan como arreglos de offsets sobre la tabla de eventos
+(no como listas de DataFrames): ``orden`` tiene las posiciones de fila en
+orden temporal y la posesión ``i`` son las filas ``orden[inicios[i]:inicios[i + 1]]``.
+Las métricas por posesión se calculan en bloque con ``np.*.reduceat``.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+# El evento cierra la posesión (queda como su último evento)
+FIN = {"PM", "Perdida", "Lateral", "Tiro", "Falta", "Falta recibida", "Corner", "OC", "Tiro recibido"}
+# El evento abre una posesión nueva (la pelota pasa a ser nuestra)
+INICIO = {"Recuperacion", "Interceptacion", "Atajada", "Saque de arco"}
+# Finales que entregan la pelota al rival
+PERDIDAS = {"PM", "Perdida"}
+# Retroceso del reloj (segundos) a partir del cual se considera que empezó otro tiempo
+SALTO_TIEMPO = 20 * 60
+
+
+@dataclass(frozen=True)
+class Posesiones:
+    orden: np.ndarray
+    inicios: np.ndarray
+
+    def __len__(self):
+        return len(self.inicios) - 1
+
+    @property
+    def largos(self):
+        return np.diff(self.inicios)
+
+    def posesion_de_evento(self):
+        """Número de posesión de cada fila de la tabla de eventos (-1 si no tiene)."""
+        ids = np.full(len(self.orden), -1, dtype=np.int64)
+        ids[self.orden] = np.repeat(np.arange(len(self)), self.largos)
+        return ids
+
+
+def _segundos(df):
+    return df["Mins"].to_numpy("float64", na_value=np.nan) * 60 + df["Secs"].to_numpy("float64", na_value=np.nan)
+
+
+def _periodos(segundos, partido):
+    """Tiempo de juego de cada evento y su reloj sin faltantes, con los eventos en el orden del registro.
+
+    Los tiempos se numeran seguidos entre partidos (cada partido empieza uno
+    nuevo). Un evento sin reloj toma el del anterior del mismo partido (0 si es el primero).
+    """
+    nuevo_partido = np.r_[True, partido[1:] != partido[:-1]]
+    posicion = np.where(~np.isnan(segundos) | nuevo_partido, np.arange(len(segundos)), 0)
+    reloj = np.nan_to_num(segundos[np.maximum.accumulate(posicion)], nan=0)
+    periodo = np.cumsum(nuevo_partido | np.r_[False, np.diff(reloj) < -SALTO_TIEMPO])
+    return periodo, reloj
+
+
+def _categorias(columna):
+    """Códigos y categorías (como texto) de una columna, sin convertir cada fila a str."""
+    columna = columna.astype("category")
+    return columna.cat.codes.to_numpy(), columna.cat.categories.astype(str).to_numpy()
+
+
+def _es(codigos, categorias, conjunto):
+    # La pertenencia se resuelve una vez por categoría y se indexa por código (-1 = faltante, queda en False)
+    return np.append(np.isin(categorias, list(conjunto)), False)[codigos]
+
+
+def segmentar(df):
+    """Posesiones de ``df`` (uno o varios partidos)."""
+    if df.empty:
+        return Posesiones(np.empty(0, dtype=np.int64), np.zeros(1, dtype=np.int64))
+    partido, _ = _categorias(df["Partido"])
+    # Orden estable: a igual tiempo se respeta el orden del registro
+    registro = np.argsort(partido, kind="stable")
+    periodo, reloj = _periodos(_segundos(df)[registro], partido[registro])
+    cronologico = np.lexsort((reloj, periodo))
+    orden, periodo = registro[cronologico], periodo[cronologico]
+    evento, categorias = _categorias(df["Event"])
+    evento = evento[orden]
+
+    # Un evento empieza posesión si abre una, si el anterior la cerró o si cambia el tiempo (o el partido)
+    empieza = _es(evento, categorias, INICIO)
+    empieza[1:] |= _es(evento[:-1], categorias, FIN) | (periodo[1:] != periodo[:-1])
+    empieza[0] = True
+    inicios = np.append(np.flatnonzero(empieza), len(orden))
+    return Posesiones(orden.astype(np.int64), inicios)
+
+
+def metricas(df, posesiones):
+    """Una fila por posesión: partido, minuto, eventos, pases, duración, progresión en X y cómo empezó y terminó."""
+    columnas = ["partido", "minuto", "eventos", "pases", "duracion", "progresion_x",
+                "evento_inicial", "evento_final", "jugador_final"]
+    if len(posesiones) == 0:
+        return pd.DataFrame(columns=columnas)
+    orden = posesiones.orden
+    primero = orden[posesiones.inicios[:-1]]
+    ultimo = orden[posesiones.inicios[1:] - 1]
+
+    segundos = _segundos(df)
+    x = df["X"].to_numpy("float64", na_value=np.nan)
+    x2 = df["X2"].to_numpy("float64", na_value=np.nan)
+    evento, categorias = _categorias(df["Event"])
+    pases = np.add.reduceat(_es(evento[orden], categorias, {"PB"}).astype(np.int64), posesiones.inicios[:-1])
+
+    # La posesión avanza desde donde empezó hasta el destino del último evento (o su origen si no tiene)
+    x_fin = np.where(np.isnan(x2[ultimo]), x[ultimo], x2[ultimo])
+    return pd.DataFrame({
+        "partido": df["Partido"].array.take(primero),
+        "minuto": segundos[primero] // 60,
+        "eventos": posesiones.largos,
+        "pases": pases,
+        "duracion": segundos[ultimo] - segundos[primero],
+        "progresion_x": x_fin - x[primero],
+        "evento_inicial": pd.Categorical.from_codes(evento[primero], categorias),
+        "evento_final": pd.Categorical.from_codes(evento[ultimo], categorias),
+        "jugador_final": df["Player"].array.take(ultimo),
+    }, columns=columnas)
+
+
+def resumen(tabla):
+    """Totales de un conjunto de posesiones (una fila de ``metricas`` por posesión)."""
+    n = len(tabla)
+    return {
+        "posesiones": n,
+        "eventos_promedio": tabla["eventos"].mean() if n else 0.0,
+        "duracion_promedio": tabla["duracion"].mean() if n else 0.0,
+        "progresion_promedio": tabla["progresion_x"].mean() if n else 0.0,
+        "terminan_en_tiro": (tabla["evento_final"] == "Tiro").mean() * 100 if n else 0.0,
+        "terminan_en_perdida": tabla["evento_final"].isin(PERDIDAS).mean() * 100 if n else 0.0,
+    }
+
+
+def por_jugador(df, posesiones, tabla, por_partido=False):
+    """Por jugador: posesiones en las que participó, su progresión media y cuántas cerró perdiendo la pelota.
+
+    Con ``por_partido=True`` sale una fila por jugador y partido.
+    """
+    ids = posesiones.posesion_de_evento()
+    jugador, categorias = _categorias(df["Player"])
+    validos = (ids >= 0) & (jugador >= 0) & ~_es(jugador, categorias, {"-"})
+    participa = pd.DataFrame({"jugador": jugador[validos], "posesion": ids[validos]}).drop_duplicates()
+    participa["jugador"] = pd.Categorical.from_codes(participa["jugador"], categorias)
+    posesion = participa["posesion"].to_numpy()
+    participa["progresion_x"] = tabla["progresion_x"].to_numpy()[posesion]
+    claves = ["jugador"]
+    if por_partido:
+        participa["partido"] = tabla["partido"].array.take(posesion)
+        claves.append("partido")
+    resultado = participa.groupby(claves, observed=True).agg(
+        posesiones=("posesion", "size"), progresion_promedio=("progresion_x", "mean")
+    )
+    cierres = tabla[tabla["evento_final"].isin(PERDIDAS)].rename(columns={"jugador_final": "jugador"})
+    cierres = cierres.groupby(claves, observed=True).size()
+    resultado["perdidas_al_cierre"] = cierres.reindex(resultado.index, fill_value=0).astype("int64")
+    return resultado.reset_index()
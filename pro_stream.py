@@ -1,459 +1,969 @@
-import streamlit as st
-import pandas as pd
-import numpy as np
-from mplsoccer import Pitch
-from matplotlib.colors import to_rgba
-
-st.title("Reserva - Excursionistas 2025 ⚽")
-
-# Barra lateral - Navegación
-# Escudo de Excursionistas (centrado)
-col1, col2, col3 = st.sidebar.columns([1, 2, 1])
-with col2:
-    st.image("Club_Atletico_Excursionistas.svg.png", width=100)
-
-# Botones de navegación
-if st.sidebar.button("Análisis de equipo", use_container_width=True):
-    st.session_state.page = "equipo"
-
-if st.sidebar.button("Análisis individual", use_container_width=True):
-    st.session_state.page = "individual"
-
-if st.sidebar.button("Estadísticas generales", use_container_width=True):
-    st.session_state.page = "estadisticas"
-
-# Firma del analista
-st.sidebar.markdown("---")
-st.sidebar.markdown("**Analista:** Cristian Aragón")
-
-# Inicializar página si no existe
-if 'page' not in st.session_state:
-    st.session_state.page = "equipo"
-
-# Cargar datos de ambos partidos
-df_italiano = pd.read_csv("sportivo italiano.csv", sep=';')
-df_midland = pd.read_csv("Midland.csv", sep=';')
-
-# Agregar columna de partido
-df_italiano['Partido'] = 'Sportivo Italiano'
-df_midland['Partido'] = 'Midland'
-
-# Combinar ambos DataFrames
-df = pd.concat([df_italiano, df_midland], ignore_index=True)
-passes = df[df["Event"].isin(["PB","PM"])].copy()
-
-# Página de Análisis Individual
-if st.session_state.page == "individual":
-    st.subheader("Análisis Individual")
-    
-    # Filtros en la página principal
-    col1, col2 = st.columns(2)
-    with col1:
-        partido = st.selectbox("Seleccionar partido", sorted(passes["Partido"].unique()))
-    
-    # Filtrar pases por partido seleccionado
-    passes_partido = passes[passes['Partido'] == partido]
-    
-    with col2:
-        player = st.selectbox("Seleccionar jugador", sorted(passes_partido["Player"].unique()))
-
-    # Función para plotear pases
-    def plot_passes(df, ax, pitch):
-        for x in df.to_dict(orient="records"):
-            x_start, y_start = x['X'], x['Y']  # inicio
-            x_end, y_end = x['X2'], x['Y2']    # fin
-            color = 'green' if x['Event'] == 'PB' else 'red'
-
-            # Aplicar transformación de coordenadas (invertir arriba/abajo)
-            y_start = 100 - y_start
-            y_end = 100 - y_end
-
-            # Flechas (sin comet) y con alpha según tipo de pase
-            alpha_val = 0.6 if x['Event'] == 'PB' else 0.2  # menos opacidad en malos
-            pitch.arrows(
-                x_start, y_start, x_end, y_end,
-                color=color, width=2, headwidth=4,
-                headlength=5, ax=ax, alpha=alpha_val
-            )
-
-
-    # Filtrar pases del jugador seleccionado y limpiar datos
-    player_passes = passes_partido[passes_partido['Player'] == player].copy()
-
-    # Limpiar datos: convertir "-" y valores vacíos a NaN, luego eliminar filas con NaN
-    player_passes['X'] = pd.to_numeric(player_passes['X'], errors='coerce')
-    player_passes['Y'] = pd.to_numeric(player_passes['Y'], errors='coerce')
-    player_passes['X2'] = pd.to_numeric(player_passes['X2'], errors='coerce')
-    player_passes['Y2'] = pd.to_numeric(player_passes['Y2'], errors='coerce')
-
-    # Eliminar filas donde falten coordenadas
-    player_passes = player_passes.dropna(subset=['X', 'Y', 'X2', 'Y2'])
-
-    # Contar pases del jugador seleccionado
-    num_correct_passes = player_passes[player_passes['Event'] == 'PB'].shape[0]
-    num_incorrect_passes = player_passes[player_passes['Event'] == 'PM'].shape[0]
-
-
-    # Crear el plot
-    pitch = Pitch(pitch_type='opta')
-    fig, ax = pitch.draw(figsize=(6, 4))
-    plot_passes(player_passes, ax, pitch)
-
-    # Filtrar todos los eventos del jugador en todos los partidos
-    player_all_events = df[df['Player'] == player].copy()
-
-    # --- Dibujar recuperaciones y pérdidas ---
-    # Filtrar eventos del jugador
-    recuperaciones = player_all_events[player_all_events['Event'] == 'Recuperacion'].copy()
-    perdidas = player_all_events[player_all_events['Event'] == 'Perdida'].copy()
-
-    # Limpiar coordenadas
-    for df_temp in [recuperaciones, perdidas]:
-        df_temp['X'] = pd.to_numeric(df_temp['X'], errors='coerce')
-        df_temp['Y'] = pd.to_numeric(df_temp['Y'], errors='coerce')
-        df_temp.dropna(subset=['X', 'Y'], inplace=True)
-        # Ajustar coordenadas (invertir arriba/abajo)
-        df_temp['Y'] = 100 - df_temp['Y']
-
-    # Graficar recuperaciones (verde) y pérdidas (rojo)
-    pitch.scatter(
-        recuperaciones['X'], recuperaciones['Y'],
-        c="green", s=15, linewidth=0.8, alpha=0.3, ax=ax
-    )
-    pitch.scatter(
-        perdidas['X'], perdidas['Y'],
-        c="red", s=15, linewidth=0.8, alpha=0.2, ax=ax
-    )
-
-    # Mostrar estadísticas del partido seleccionado
-    st.markdown("---")
-    st.subheader(f"Estadísticas de {player} vs {partido}")
-    col1, col2 = st.columns(2)
-    with col1:
-        st.metric("Pases Correctos", num_correct_passes, delta=None)
-    with col2:
-        st.metric("Pases Incorrectos", num_incorrect_passes, delta=None)
-
-    # Mostrar el plot
-    st.pyplot(fig)
-    
-    # Estadísticas generales (todos los partidos) - Debajo del campo
-    st.markdown("---")
-    st.subheader("Estadísticas Generales")
-    
-    # Para estadísticas de pases, limpiar datos de coordenadas
-    player_all_passes = player_all_events[player_all_events['Event'].isin(['PB', 'PM'])].copy()
-    player_all_passes['X'] = pd.to_numeric(player_all_passes['X'], errors='coerce')
-    player_all_passes['Y'] = pd.to_numeric(player_all_passes['Y'], errors='coerce')
-    player_all_passes['X2'] = pd.to_numeric(player_all_passes['X2'], errors='coerce')
-    player_all_passes['Y2'] = pd.to_numeric(player_all_passes['Y2'], errors='coerce')
-    player_all_passes = player_all_passes.dropna(subset=['X', 'Y', 'X2', 'Y2'])
-    
-    # Calcular estadísticas generales
-    total_correct = player_all_passes[player_all_passes['Event'] == 'PB'].shape[0]
-    total_incorrect = player_all_passes[player_all_passes['Event'] == 'PM'].shape[0]
-    total_passes = total_correct + total_incorrect
-    accuracy_percentage = (total_correct / total_passes * 100) if total_passes > 0 else 0
-    
-    # Calcular estadísticas adicionales
-    pelotas_recuperadas = player_all_events[player_all_events['Event'] == 'Recuperacion'].shape[0]
-    pelotas_perdidas = player_all_events[player_all_events['Event'] == 'Perdida'].shape[0]
-    faltas_realizadas = player_all_events[player_all_events['Event'] == 'Falta'].shape[0]
-    faltas_recibidas = player_all_events[player_all_events['Event'] == 'Falta recibida'].shape[0]
-    total_tiros = player_all_events[player_all_events['Event'] == 'Tiro'].shape[0]
-    tiros_al_arco = player_all_events[(player_all_events['Event'] == 'Tiro') & 
-                                     (player_all_events['Result'].str.contains('Arco|Gol', na=False))].shape[0]
-    goles = player_all_events[(player_all_events['Event'] == 'Tiro') & 
-                             (player_all_events['Result'].str.contains('Gol', na=False))].shape[0]
-    partidos_jugados = len(player_all_events['Partido'].unique())
-    
-    # Mostrar estadísticas generales - Primera fila: Pases
-    st.markdown("#### Pases")
-    col1, col2, col3 = st.columns(3)
-    with col1:
-        st.metric("Pases totales", f"{total_correct}/{total_passes}")
-    with col2:
-        st.metric("Precisión", f"{accuracy_percentage:.1f}%")
-    with col3:
-        st.metric("Partidos Jugados", partidos_jugados)
-    
-    # Segunda fila: Tiros
-    st.markdown("#### Tiros")
-    col1, col2 = st.columns(2)
-    with col1:
-        st.metric("Tiros totales", f"{tiros_al_arco}/{total_tiros}")
-    with col2:
-        st.metric("Goles", goles)
-    
-    # Tercera fila: Pelotas recuperadas y perdidas
-    st.markdown("#### Posesión")
-    col1, col2 = st.columns(2)
-    with col1:
-        st.metric("Pelotas recuperadas", pelotas_recuperadas)
-    with col2:
-        st.metric("Pelotas perdidas", pelotas_perdidas)
-    
-    # Cuarta fila: Faltas
-    st.markdown("#### Faltas")
-    col1, col2 = st.columns(2)
-    with col1:
-        st.metric("Faltas Realizadas", faltas_realizadas)
-    with col2:
-        st.metric("Faltas Recibidas", faltas_recibidas)
-    
-    
-# Página de Estadísticas Generales
-elif st.session_state.page == "estadisticas":
-    st.subheader("Estadísticas Generales")
-    
-    # Calcular estadísticas para todos los jugadores
-    def calcular_estadisticas_jugador(player_name):
-        player_events = df[df['Player'] == player_name]
-        
-        # Pases
-        pases_correctos = player_events[player_events['Event'] == 'PB'].shape[0]
-        pases_incorrectos = player_events[player_events['Event'] == 'PM'].shape[0]
-        total_pases = pases_correctos + pases_incorrectos
-        porcentaje_pases = (pases_correctos / total_pases * 100) if total_pases > 0 else 0
-        
-        # Tiros y goles
-        total_tiros = player_events[player_events['Event'] == 'Tiro'].shape[0]
-        tiros_al_arco = player_events[(player_events['Event'] == 'Tiro') & 
-                                     (player_events['Result'].str.contains('Arco|Gol', na=False))].shape[0]
-        goles = player_events[(player_events['Event'] == 'Tiro') & 
-                             (player_events['Result'].str.contains('Gol', na=False))].shape[0]
-        
-        # Recuperaciones
-        pelotas_recuperadas = player_events[player_events['Event'] == 'Recuperacion'].shape[0]
-        
-        # Partidos jugados
-        partidos_jugados = len(player_events['Partido'].unique())
-        
-        return {
-            'jugador': player_name,
-            'pases_correctos': pases_correctos,
-            'total_pases': total_pases,
-            'porcentaje_pases': porcentaje_pases,
-            'total_tiros': total_tiros,
-            'tiros_al_arco': tiros_al_arco,
-            'goles': goles,
-            'pelotas_recuperadas': pelotas_recuperadas,
-            'partidos_jugados': partidos_jugados
-        }
-    
-    # Obtener todos los jugadores únicos
-    jugadores_unicos = df['Player'].unique()
-    
-    # Calcular estadísticas para cada jugador
-    estadisticas_jugadores = []
-    for jugador in jugadores_unicos:
-        if jugador and jugador != '-':  # Filtrar valores nulos o vacíos
-            stats = calcular_estadisticas_jugador(jugador)
-            estadisticas_jugadores.append(stats)
-    
-    # Convertir a DataFrame
-    df_stats = pd.DataFrame(estadisticas_jugadores)
-    
-    # Tabla 1: Eficacia (Top 5 por mayor porcentaje de pases correctos)
-    st.markdown("### 🎯 Eficacia")
-    df_eficacia = df_stats.nlargest(5, 'porcentaje_pases')[['jugador', 'total_pases', 'pases_correctos', 'porcentaje_pases']].copy()
-    df_eficacia['pases_totales'] = df_eficacia.apply(lambda x: f"{x['pases_correctos']}/{x['total_pases']}", axis=1)
-    df_eficacia['%_pases_correctos'] = df_eficacia['porcentaje_pases'].round(1).astype(str) + '%'
-    df_eficacia_display = df_eficacia[['jugador', 'pases_totales', '%_pases_correctos']].copy()
-    df_eficacia_display.columns = ['Jugador', 'Pases totales', '% Pases correctos']
-    st.dataframe(df_eficacia_display, use_container_width=True)
-    
-    # Tabla 2: Goleadores (Top 5 goles)
-    st.markdown("### ⚽ Goleadores")
-    df_goleadores = df_stats.nlargest(5, 'goles')[['jugador', 'total_tiros', 'tiros_al_arco', 'goles', 'partidos_jugados']].copy()
-    df_goleadores['tiros_totales'] = df_goleadores.apply(lambda x: f"{x['tiros_al_arco']}/{x['total_tiros']}", axis=1)
-    df_goleadores['goles_por_partido'] = (df_goleadores['goles'] / df_goleadores['partidos_jugados']).round(2)
-    df_goleadores_display = df_goleadores[['jugador', 'tiros_totales', 'goles', 'goles_por_partido']].copy()
-    df_goleadores_display.columns = ['Jugador', 'Tiros totales', 'Goles', 'Goles/Partido']
-    st.dataframe(df_goleadores_display, use_container_width=True)
-    
-    # Tabla 3: Defensa (Top 5 recuperaciones)
-    st.markdown("### 🛡️ Defensa")
-    df_defensa = df_stats.nlargest(5, 'pelotas_recuperadas')[['jugador', 'pelotas_recuperadas']].copy()
-    df_defensa.columns = ['Jugador', 'Pelotas recuperadas']
-    st.dataframe(df_defensa, use_container_width=True)
-
-# Página de Análisis de Equipo
-elif st.session_state.page == "equipo":
-    st.subheader("Análisis de Equipo")
-    
-    # Filtro de rival
-    rival = st.selectbox("Seleccionar rival", sorted(df["Partido"].unique()))
-    
-    # Filtrar datos por rival seleccionado
-    df_rival = df[df["Partido"] == rival].copy()
-    
-    if not df_rival.empty:
-        st.markdown(f"### Red de Pases vs {rival}")
-        
-        # --- 3. Filtrar solo pases completados para la red ---
-        passes = df_rival[df_rival["Event"] == "PB"].copy()
-        
-        if not passes.empty:
-            # Limpiar datos de coordenadas
-            passes['X'] = pd.to_numeric(passes['X'], errors='coerce')
-            passes['Y'] = pd.to_numeric(passes['Y'], errors='coerce')
-            passes['X2'] = pd.to_numeric(passes['X2'], errors='coerce')
-            passes['Y2'] = pd.to_numeric(passes['Y2'], errors='coerce')
-            passes = passes.dropna(subset=['X', 'Y', 'X2', 'Y2'])
-            
-            # --- 4. Posiciones promedio por jugador ---
-            avg_pos = passes.groupby("Player").agg({"X": "mean", "Y": "mean", "recep": "count"}).reset_index()
-            avg_pos.rename(columns={"recep": "count"}, inplace=True)
-            
-            # --- 5. Conteo de pases entre jugadores ---
-            pass_counts = passes.groupby(["Player", "recep"]).size().reset_index(name="pass_count")
-            pass_counts = pass_counts[pass_counts["pass_count"] > 0]
-            
-            # --- 6. Merge de posiciones (inicio y fin) ---
-            pass_counts = pass_counts.merge(avg_pos, left_on="Player", right_on="Player")
-            pass_counts = pass_counts.merge(avg_pos, left_on="recep", right_on="Player", suffixes=["", "_end"])
-            
-            # --- 7. Orientación cancha ---
-            avg_pos["Y"] = 100 - avg_pos["Y"]
-            pass_counts["Y"] = 100 - pass_counts["Y"]
-            pass_counts["Y_end"] = 100 - pass_counts["Y_end"]
-            
-            gk_x = avg_pos["X"].min()
-            if gk_x > 50:
-                avg_pos["X"] = 100 - avg_pos["X"]
-                pass_counts["X"] = 100 - pass_counts["X"]
-                pass_counts["X_end"] = 100 - pass_counts["X_end"]
-                passes["X"] = 100 - passes["X"]  # espejar para heatmap
-                passes["Y"] = 100 - passes["Y"]
-            
-            # --- 8. Estilo de la red ---
-            MAX_LINE_WIDTH = 10
-            MAX_MARKER_SIZE = 500
-            MIN_TRANSPARENCY = 0.1
-            
-            pass_counts["width"] = (pass_counts.pass_count / pass_counts.pass_count.max()) * MAX_LINE_WIDTH
-            
-            # Cambiar color de conexiones a verde
-            color = np.array(to_rgba("green"))
-            color = np.tile(color, (len(pass_counts), 1))
-            c_transparency = pass_counts.pass_count / pass_counts.pass_count.max()
-            c_transparency = (c_transparency * (1 - MIN_TRANSPARENCY)) + MIN_TRANSPARENCY
-            color[:, 3] = c_transparency
-            
-            avg_pos["marker_size"] = (avg_pos["count"] / avg_pos["count"].max()) * MAX_MARKER_SIZE
-            
-            # --- 9. Dibujar cancha ---
-            pitch = Pitch(pitch_type="opta", line_color="black", pitch_color="white")
-            fig, ax = pitch.draw(figsize=(12, 8), constrained_layout=False, tight_layout=True)
-            fig.patch.set_facecolor("white")
-            ax.set_facecolor("white")
-            
-            # --- 10. Conexiones ---
-            for i, row in pass_counts.iterrows():
-                ci = min(i, len(color) - 1)
-                pitch.lines(row["X"], row["Y"], row["X_end"], row["Y_end"],
-                            ax=ax, color=color[ci], linewidth=row["width"], zorder=2)
-            
-            # --- 11. Nodos ---
-            pitch.scatter(avg_pos.X, avg_pos.Y, ax=ax, color="black", ec="white",
-                          s=avg_pos["marker_size"], zorder=3)
-            
-            for _, r in avg_pos.iterrows():
-                ax.text(
-                    r.X, r.Y + 2.5, r.Player,
-                    color="black", ha="center",
-                    fontsize=10, fontweight="bold", zorder=4,
-                    bbox=dict(facecolor="white", edgecolor="black", boxstyle="round,pad=0.3")
-                )
-            
-            # Mostrar el gráfico
-            st.pyplot(fig)
-
-            # ========================
-            # 🔥 Heatmap Zonal de Pases
-            # ========================
-            st.markdown("### 🔥 Mapa de calor zonal de pases")
-
-            # Dibujar Heatmap sobre cancha (3x3)
-            pitch = Pitch(pitch_type="opta", line_color="black", pitch_color="white")
-            fig, ax = pitch.draw(figsize=(8, 6))
-            heatmap, xedges, yedges = np.histogram2d(
-                passes["X"], passes["Y"], bins=[3, 3], range=[[0, 100], [0, 100]]
-            )
-            pcm = ax.pcolormesh(xedges, yedges, heatmap.T, cmap="Greens", alpha=0.5)
-            fig.colorbar(pcm, ax=ax, shrink=0.7, label="Cantidad de pases")
-            st.pyplot(fig)
-
-            # Función para asignar zona 3x3
-            def asignar_zona(x, y):
-                if x < 33:
-                    col = "Salida"
-                elif x < 66:
-                    col = "Medio"
-                else:
-                    col = "Último tercio"
-                
-                if y < 33:
-                    fila = "Derecha"
-                elif y < 66:
-                    fila = "Centro"
-                else:
-                    fila = "Izquierda"
-                return f"{col} - {fila}"
-
-            # Asignar zona de inicio y fin a cada pase
-            passes["zona_inicio"] = passes.apply(lambda r: asignar_zona(r["X"], r["Y"]), axis=1)
-            passes["zona_fin"] = passes.apply(lambda r: asignar_zona(r["X2"], r["Y2"]), axis=1)
-
-            # Tabla de conteo por zona de inicio
-            zonas_count = passes["zona_inicio"].value_counts().reset_index()
-            zonas_count.columns = ["Zona", "Pases"]
-            st.dataframe(zonas_count, use_container_width=True)
-            
-            # Estadísticas adicionales
-            st.markdown("### Estadísticas del Partido")
-            
-            # Calcular pases totales (correctos e incorrectos)
-            total_pases_correctos = len(passes)
-            total_pases_incorrectos = len(df_rival[df_rival["Event"] == "PM"])
-            total_pases = total_pases_correctos + total_pases_incorrectos
-            
-            # Top 3 conexiones de pases
-            top_conexiones = pass_counts.nlargest(3, 'pass_count')
-            
-            # Jugador más participativo (quien dio más pases)
-            pases_por_jugador = passes['Player'].value_counts()
-            jugador_mas_participativo = pases_por_jugador.index[0] if not pases_por_jugador.empty else "N/A"
-            max_pases = pases_por_jugador.iloc[0] if not pases_por_jugador.empty else 0
-            
-            # Mostrar estadísticas
-            st.markdown("#### 📊 Posesión")
-            col1, col2 = st.columns(2)
-            with col1:
-                st.metric("Pases totales", f"{total_pases_correctos}/{total_pases}")
-            with col2:
-                porcentaje_efectividad = (total_pases_correctos / total_pases * 100) if total_pases > 0 else 0
-                st.metric("Efectividad", f"{porcentaje_efectividad:.1f}%")
-            
-            
-            # Top 3 conexiones
-            st.markdown("#### 🔗 Top 3 Conexiones de Pases")
-            for i, (_, row) in enumerate(top_conexiones.iterrows(), 1):
-                st.write(f"{i}. **{row['Player']}** → **{row['recep']}**: {row['pass_count']} pases")
-            
-            # Jugador más participativo
-            st.markdown("#### ⭐ Jugador Más Participativo")
-            st.write(f"**{jugador_mas_participativo}** con {max_pases} pases")
-        else:
-            st.warning(f"No hay pases completados registrados para el partido vs {rival}")
-    else:
-        st.warning("No hay datos disponibles para el rival seleccionado")
-
-
-
-
-
-
-
-
+import os
+
+import streamlit as st
+import pandas as pd
+
+import agregados
+import comparacion
+import datos
+import en_vivo
+import instrumentacion
+import posesiones
+import red_pases
+import tendencias
+import zonas
+from cache_figuras import CacheFiguras, rasterizar
+from indice_espacial import IndiceEspacial
+
+st.title("Reserva - Excursionistas 2025 ⚽")
+
+# Barra lateral - Navegación
+# Escudo de Excursionistas (centrado)
+col1, col2, col3 = st.sidebar.columns([1, 2, 1])
+with col2:
+    st.image("Club_Atletico_Excursionistas.svg.png", width=100)
+
+# Botones de navegación
+if st.sidebar.button("Análisis de equipo", use_container_width=True):
+    st.session_state.page = "equipo"
+
+if st.sidebar.button("Análisis individual", use_container_width=True):
+    st.session_state.page = "individual"
+
+if st.sidebar.button("Estadísticas generales", use_container_width=True):
+    st.session_state.page = "estadisticas"
+
+if st.sidebar.button("Comparación", use_container_width=True):
+    st.session_state.page = "comparacion"
+
+if st.sidebar.button("Partido en vivo", use_container_width=True):
+    st.session_state.page = "en_vivo"
+
+# Firma del analista
+st.sidebar.markdown("---")
+st.sidebar.markdown("**Analista:** Cristian Aragón")
+
+# Medición de tiempos por etapa (panel en la barra lateral y/o log JSON en EXCURSIO_LOG_TIEMPOS)
+panel_tiempos = st.sidebar.checkbox("Panel de tiempos", key="panel_tiempos")
+ruta_log_tiempos = os.environ.get("EXCURSIO_LOG_TIEMPOS")
+instrumentacion.iniciar(panel_tiempos or bool(ruta_log_tiempos))
+
+# Inicializar página si no existe
+if 'page' not in st.session_state:
+    st.session_state.page = "equipo"
+
+# Cargar datos (almacén columnar si fue ingerido con `python datos.py`, si no los CSV).
+# Se validan y parsean una sola vez y se comparten entre reruns y sesiones; la firma de la
+# fuente invalida la cache si se agrega o modifica un partido. Cada página pide solo los
+# partidos y columnas que usa. Las páginas solo filtran: el DataFrame compartido no se
+# modifica nunca (con copy-on-write, columnas nuevas o espejadas van con `assign`).
+@st.cache_resource(max_entries=32, show_spinner="Cargando partidos...")
+def cargar_datos(fuente, partidos=None, columnas=None):
+    instrumentacion.marcar_fallo()
+    if fuente[0] == "csv":
+        return datos.recortar(leer_csv(fuente)[0], partidos, columnas)
+    return datos.cargar(fuente, partidos, columnas)
+
+
+# Sin almacén, los CSV se leen y validan una sola vez por versión de datos: los recortes de
+# cargar_datos y los problemas de validación salen de esa misma lectura
+@st.cache_resource(max_entries=2, show_spinner="Cargando partidos...")
+def leer_csv(fuente):
+    instrumentacion.marcar_fallo()
+    problemas = {}
+    return datos.cargar(fuente, problemas=problemas), problemas
+
+
+# Totales de temporada (conteos por jugador y por par pasador -> receptor). Con almacén se leen
+# los totales mantenidos incrementalmente por la ingesta; con CSV se calculan de los eventos.
+@st.cache_data(max_entries=8, show_spinner=False)
+def totales_temporada(fuente):
+    instrumentacion.marcar_fallo()
+    if fuente[0] == "almacen":
+        totales = agregados.leer_temporada(fuente[1])
+        if totales is not None:
+            return totales
+    return agregados.conteos(cargar_datos(fuente, columnas=("Player", "Event", "Result", "Partido", "recep")))
+
+
+# Tabla jugador x métrica de toda la temporada, compartida por las páginas individual y de estadísticas
+@st.cache_data(max_entries=8, show_spinner=False)
+def estadisticas_jugadores(fuente):
+    instrumentacion.marcar_fallo()
+    return agregados.completar_estadisticas(totales_temporada(fuente)["jugadores"])
+
+
+# Figuras ya rasterizadas, compartidas entre sesiones (presupuesto en MB configurable por entorno)
+@st.cache_resource
+def cache_figuras():
+    return CacheFiguras(int(os.environ.get("EXCURSIO_CACHE_FIGURAS_MB", "64")) * 2**20)
+
+
+# Red de pases de cada partido, construida una vez por versión de ese partido: agregar o corregir
+# otro partido no la invalida (la clave es el origen de los datos y la huella del partido en la fuente)
+def red_partido(fuente, partido):
+    return _red_partido(fuente, fuente[:2] + (partido, dict(fuente[2])[partido]))
+
+
+@st.cache_resource(max_entries=64, show_spinner=False)
+def _red_partido(_fuente, clave):
+    instrumentacion.marcar_fallo()
+    partido = clave[2]
+    # Sin pasar por cargar_datos, para no ocupar lugares de su cache con un partido por vez
+    if _fuente[0] == "csv":
+        df_partido = datos.recortar(leer_csv(_fuente)[0], (partido,))
+    else:
+        df_partido = datos.cargar(_fuente, (partido,))
+    pases = df_partido[df_partido["Event"] == "PB"].dropna(subset=["X", "Y", "X2", "Y2"])
+    return red_pases.construir_red(pases)
+
+
+# Red de toda la temporada: suma de las redes por partido, sin volver a los eventos
+@st.cache_resource(max_entries=8, show_spinner=False)
+def red_temporada(fuente):
+    instrumentacion.marcar_fallo()
+    return red_pases.combinar_redes(red_partido(fuente, p) for p in datos.partidos_disponibles(fuente))
+
+
+# Índice espacial (inicio y fin de cada evento) sobre toda la temporada, una vez por versión de datos.
+# Las consultas devuelven posiciones de fila de cargar_datos(fuente).
+@st.cache_resource(max_entries=4, show_spinner=False)
+def indice_temporada(fuente):
+    instrumentacion.marcar_fallo()
+    return IndiceEspacial(cargar_datos(fuente))
+
+
+# Posesiones de toda la temporada (offsets sobre cargar_datos(fuente)), con una fila de métricas por
+# posesión y la participación de cada jugador por partido
+@st.cache_resource(max_entries=4, show_spinner=False)
+def posesiones_temporada(fuente):
+    instrumentacion.marcar_fallo()
+    df = cargar_datos(fuente)
+    segmentos = posesiones.segmentar(df)
+    tabla = posesiones.metricas(df, segmentos)
+    return tabla, posesiones.por_jugador(df, segmentos, tabla, por_partido=True)
+
+
+# Conteos por jugador y partido en el orden de la fuente: base de las series de forma (ventanas de N partidos)
+@st.cache_resource(max_entries=4, show_spinner=False)
+def tendencias_temporada(fuente):
+    instrumentacion.marcar_fallo()
+    df = cargar_datos(fuente, columnas=("Player", "Event", "Result", "Partido"))
+    return tendencias.por_partido(df, datos.partidos_disponibles(fuente))
+
+
+# Métricas por tramo de 15 minutos (de un jugador o de todo el equipo), promediadas por partido
+@st.cache_data(max_entries=64, show_spinner=False)
+def tendencias_por_minuto(fuente, jugador=None):
+    instrumentacion.marcar_fallo()
+    df = cargar_datos(fuente, columnas=("Player", "Event", "Result", "Partido", "Mins"))
+    return tendencias.por_minuto(df if jugador is None else df[df["Player"] == jugador])
+
+
+# Registro y estado de cada partido en vivo, compartidos entre sesiones (un solo escritor por archivo)
+@st.cache_resource(show_spinner=False)
+def partido_en_vivo(rival):
+    return en_vivo.Registro(en_vivo.ruta_partido(rival)), en_vivo.EstadoEnVivo(rival)
+
+
+# Pool de procesos que dibuja los mapas del modo comparación (compartido entre sesiones)
+@st.cache_resource
+def pool_comparacion():
+    return comparacion.crear_pool()
+
+
+# Filas descartadas o corregidas al validar cada partido
+@st.cache_data(max_entries=8, show_spinner=False)
+def problemas_datos(fuente):
+    if fuente[0] == "csv":
+        return leer_csv(fuente)[1]
+    return datos.problemas(fuente)
+
+
+fuente = datos.fuente_datos()
+
+problemas_por_partido = {p: lista for p, lista in problemas_datos(fuente).items() if lista}
+if problemas_por_partido:
+    with st.sidebar.expander(f"⚠️ Datos con problemas ({sum(map(len, problemas_por_partido.values()))})"):
+        for partido, lista in problemas_por_partido.items():
+            st.markdown(f"**{partido}**")
+            st.text("\n".join(lista))
+
+
+# Ancho máximo del contenido en Streamlit: una imagen más ancha se redimensiona y recodifica en cada rerun
+ANCHO_MAX_FIGURA_PX = 1460
+
+
+def reservar_figura():
+    """Lugar para una figura que se dibuja después de las tablas y métricas de la página."""
+    lugar = st.empty()
+    lugar.caption("Cargando figura…")
+    return lugar
+
+
+# Métricas de forma: valor en la ventana que termina en el último partido, variación y la serie como sparkline
+METRICAS_FORMA = [("precision_pases", "normal"), ("recuperaciones", "normal"), ("perdidas", "inverse"), ("tiros", "normal")]
+
+
+def metricas_forma(forma):
+    for col, (clave, color) in zip(st.columns(len(METRICAS_FORMA)), METRICAS_FORMA):
+        serie = forma[clave].dropna().round(1)
+        with col:
+            if serie.empty:
+                st.metric(tendencias.SERIES[clave], "-", border=True)
+                continue
+            delta = round(serie.iloc[-1] - serie.iloc[-2], 1) if len(serie) > 1 else None
+            st.metric(tendencias.SERIES[clave], f"{serie.iloc[-1]:.1f}", delta, delta_color=color,
+                      chart_data=serie.tolist(), chart_type="line", border=True)
+
+
+def ventana_forma(cantidad_partidos, clave):
+    return st.number_input("Ventana (últimos N partidos)", 1, max(cantidad_partidos, 1),
+                           min(3, max(cantidad_partidos, 1)), key=clave)
+
+
+def mostrar_figura(clave, dibujar, lugar=None):
+    """Muestra la figura de ``clave`` (parámetros de la vista); ``dibujar`` solo se llama si no está en cache.
+
+    Con ``lugar`` (de ``reservar_figura``) la figura reemplaza al marcador en su posición.
+    """
+    cache = cache_figuras()
+    with instrumentacion.tramo("figura " + "/".join(map(str, clave[:2])), cache=True):
+        png = cache.obtener(clave + (fuente,))
+        if png is None:
+            instrumentacion.marcar_fallo()
+            with instrumentacion.tramo("dibujo"):
+                fig = dibujar()
+            with instrumentacion.tramo("rasterizado"):
+                png = rasterizar(fig, ancho_max_px=ANCHO_MAX_FIGURA_PX)
+            cache.guardar(clave + (fuente,), png)
+        with instrumentacion.tramo("envío"):
+            (lugar or st).image(png, use_container_width=True)
+
+
+# Página de Análisis Individual
+if st.session_state.page == "individual":
+    st.subheader("Análisis Individual")
+    
+    with instrumentacion.tramo("carga", cache=True) as t:
+        df = cargar_datos(fuente)
+        t.filas = len(df)
+    passes = df[df["Event"].isin(["PB","PM"])]
+    
+    # Filtros en la página principal
+    col1, col2 = st.columns(2)
+    with col1:
+        partido = st.selectbox("Seleccionar partido", sorted(passes["Partido"].unique()))
+    
+    # Filtrar pases por partido seleccionado
+    passes_partido = passes[passes['Partido'] == partido]
+    
+    with col2:
+        # Sin los eventos del rival (Player "-"), que no tienen fila en las estadísticas
+        player = st.selectbox("Seleccionar jugador",
+                              sorted(agregados.eventos_de_jugadores(passes_partido)["Player"].unique()))
+
+    with instrumentacion.tramo("filtrado") as t:
+        # Pases del jugador con coordenadas completas (ya vienen numéricas de la carga)
+        player_passes = passes_partido[passes_partido['Player'] == player].dropna(subset=['X', 'Y', 'X2', 'Y2'])
+
+        # Contar pases del jugador seleccionado
+        num_correct_passes = player_passes[player_passes['Event'] == 'PB'].shape[0]
+        num_incorrect_passes = player_passes[player_passes['Event'] == 'PM'].shape[0]
+        t.filas = len(passes_partido)
+
+
+    def dibujar_mapa_jugador():
+        # Los módulos de gráficos se importan solo si la figura no está en cache
+        from mplsoccer import Pitch
+        import graficos
+
+        # Crear el plot
+        pitch = Pitch(pitch_type='opta')
+        fig, ax = pitch.draw(figsize=(6, 4))
+        graficos.dibujar_pases(player_passes, ax, pitch)
+
+        # Filtrar todos los eventos del jugador en todos los partidos
+        player_all_events = df[df['Player'] == player].dropna(subset=['X', 'Y'])
+
+        # --- Dibujar recuperaciones y pérdidas ---
+        # Ajustar coordenadas (invertir arriba/abajo); a partir de acá Y es una columna nueva, no la de la carga
+        recuperaciones = player_all_events[player_all_events['Event'] == 'Recuperacion']
+        recuperaciones = recuperaciones.assign(Y=100 - recuperaciones['Y'])
+        perdidas = player_all_events[player_all_events['Event'] == 'Perdida']
+        perdidas = perdidas.assign(Y=100 - perdidas['Y'])
+
+        # Graficar recuperaciones (verde) y pérdidas (rojo)
+        pitch.scatter(
+            recuperaciones['X'], recuperaciones['Y'],
+            c="green", s=15, linewidth=0.8, alpha=0.3, ax=ax
+        )
+        pitch.scatter(
+            perdidas['X'], perdidas['Y'],
+            c="red", s=15, linewidth=0.8, alpha=0.2, ax=ax
+        )
+        return fig
+
+    # Mostrar estadísticas del partido seleccionado
+    st.markdown("---")
+    st.subheader(f"Estadísticas de {player} vs {partido}")
+    col1, col2 = st.columns(2)
+    with col1:
+        st.metric("Pases Correctos", num_correct_passes, delta=None)
+    with col2:
+        st.metric("Pases Incorrectos", num_incorrect_passes, delta=None)
+
+    # Posesiones del partido en las que participó el jugador
+    with instrumentacion.tramo("posesiones", cache=True):
+        participacion = posesiones_temporada(fuente)[1]
+        participacion = participacion[(participacion["jugador"] == player) & (participacion["partido"] == partido)]
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Posesiones", int(participacion["posesiones"].sum()))
+    with col2:
+        progresion = participacion["progresion_promedio"].mean() if not participacion.empty else 0.0
+        st.metric("Progresión media (X)", f"{progresion:.1f}")
+    with col3:
+        st.metric("Pérdidas al cierre", int(participacion["perdidas_al_cierre"].sum()))
+
+    # Lugar del plot (se dibuja al final, después de las estadísticas)
+    lugar_mapa = reservar_figura()
+    
+    # Estadísticas generales (todos los partidos) - Debajo del campo
+    st.markdown("---")
+    st.subheader("Estadísticas Generales")
+    
+    with instrumentacion.tramo("estadísticas temporada", cache=True):
+        # Estadísticas de la temporada desde la tabla precalculada
+        # Un jugador sin fila en la tabla (sin eventos propios) queda en cero
+        stats_jugador = estadisticas_jugadores(fuente).set_index("jugador").reindex([player], fill_value=0).iloc[0]
+        total_correct = int(stats_jugador["pases_correctos"])
+        total_passes = int(stats_jugador["total_pases"])
+        accuracy_percentage = stats_jugador["porcentaje_pases"]
+        pelotas_recuperadas = int(stats_jugador["pelotas_recuperadas"])
+        pelotas_perdidas = int(stats_jugador["pelotas_perdidas"])
+        faltas_realizadas = int(stats_jugador["faltas_realizadas"])
+        faltas_recibidas = int(stats_jugador["faltas_recibidas"])
+        total_tiros = int(stats_jugador["total_tiros"])
+        tiros_al_arco = int(stats_jugador["tiros_al_arco"])
+        goles = int(stats_jugador["goles"])
+        partidos_jugados = int(stats_jugador["partidos_jugados"])
+    
+    # Mostrar estadísticas generales - Primera fila: Pases
+    st.markdown("#### Pases")
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Pases totales", f"{total_correct}/{total_passes}")
+    with col2:
+        st.metric("Precisión", f"{accuracy_percentage:.1f}%")
+    with col3:
+        st.metric("Partidos Jugados", partidos_jugados)
+    
+    # Segunda fila: Tiros
+    st.markdown("#### Tiros")
+    col1, col2 = st.columns(2)
+    with col1:
+        st.metric("Tiros totales", f"{tiros_al_arco}/{total_tiros}")
+    with col2:
+        st.metric("Goles", goles)
+    
+    # Tercera fila: Pelotas recuperadas y perdidas
+    st.markdown("#### Posesión")
+    col1, col2 = st.columns(2)
+    with col1:
+        st.metric("Pelotas recuperadas", pelotas_recuperadas)
+    with col2:
+        st.metric("Pelotas perdidas", pelotas_perdidas)
+    
+    # Cuarta fila: Faltas
+    st.markdown("#### Faltas")
+    col1, col2 = st.columns(2)
+    with col1:
+        st.metric("Faltas Realizadas", faltas_realizadas)
+    with col2:
+        st.metric("Faltas Recibidas", faltas_recibidas)
+
+    # Forma: cada punto de la serie es la ventana de sus últimos N partidos jugados hasta ese partido
+    st.markdown("#### 📈 Forma")
+    with instrumentacion.tramo("forma", cache=True):
+        por_partido_jugador = tendencias_temporada(fuente)
+        por_partido_jugador = por_partido_jugador[por_partido_jugador["jugador"] == player]
+    n_forma = ventana_forma(len(por_partido_jugador), "ventana_forma_jugador")
+    metricas_forma(tendencias.forma_jugadores(por_partido_jugador, n_forma))
+    with instrumentacion.tramo("tramos de 15 minutos", cache=True):
+        por_minuto = tendencias_por_minuto(fuente, player)
+    st.caption("Por tramo de 15 minutos (promedio por partido jugado; un tramo final más corto se lleva a 15 minutos)")
+    st.bar_chart(por_minuto[["recuperaciones", "perdidas", "tiros"]].rename(columns=tendencias.SERIES),
+                 stack=False, sort=False, x_label="Minutos")
+    
+    # Mostrar el plot
+    mostrar_figura(("individual", partido, player), dibujar_mapa_jugador, lugar_mapa)
+    
+    
+# Página de Estadísticas Generales
+elif st.session_state.page == "estadisticas":
+    st.subheader("Estadísticas Generales")
+    
+    # Tabla jugador x métrica calculada en una sola pasada (cacheada)
+    with instrumentacion.tramo("estadísticas jugadores", cache=True) as t:
+        df_stats = estadisticas_jugadores(fuente)
+        t.filas = len(df_stats)
+    
+    # Tabla 1: Eficacia (Top 5 por mayor porcentaje de pases correctos)
+    st.markdown("### 🎯 Eficacia")
+    df_eficacia = df_stats.nlargest(5, 'porcentaje_pases')[['jugador', 'total_pases', 'pases_correctos', 'porcentaje_pases']].copy()
+    df_eficacia['pases_totales'] = df_eficacia.apply(lambda x: f"{x['pases_correctos']}/{x['total_pases']}", axis=1)
+    df_eficacia['%_pases_correctos'] = df_eficacia['porcentaje_pases'].round(1).astype(str) + '%'
+    df_eficacia_display = df_eficacia[['jugador', 'pases_totales', '%_pases_correctos']].copy()
+    df_eficacia_display.columns = ['Jugador', 'Pases totales', '% Pases correctos']
+    st.dataframe(df_eficacia_display, use_container_width=True)
+    
+    # Tabla 2: Goleadores (Top 5 goles)
+    st.markdown("### ⚽ Goleadores")
+    df_goleadores = df_stats.nlargest(5, 'goles')[['jugador', 'total_tiros', 'tiros_al_arco', 'goles', 'partidos_jugados']].copy()
+    df_goleadores['tiros_totales'] = df_goleadores.apply(lambda x: f"{x['tiros_al_arco']}/{x['total_tiros']}", axis=1)
+    df_goleadores['goles_por_partido'] = (df_goleadores['goles'] / df_goleadores['partidos_jugados']).round(2)
+    df_goleadores_display = df_goleadores[['jugador', 'tiros_totales', 'goles', 'goles_por_partido']].copy()
+    df_goleadores_display.columns = ['Jugador', 'Tiros totales', 'Goles', 'Goles/Partido']
+    st.dataframe(df_goleadores_display, use_container_width=True)
+    
+    # Tabla 3: Defensa (Top 5 recuperaciones)
+    st.markdown("### 🛡️ Defensa")
+    df_defensa = df_stats.nlargest(5, 'pelotas_recuperadas')[['jugador', 'pelotas_recuperadas']].copy()
+    df_defensa.columns = ['Jugador', 'Pelotas recuperadas']
+    st.dataframe(df_defensa, use_container_width=True)
+    
+    # Tabla 4: Conexiones (Top 5 pares pasador -> receptor de la temporada)
+    st.markdown("### 🔗 Conexiones")
+    with instrumentacion.tramo("conexiones temporada", cache=True):
+        df_conexiones = totales_temporada(fuente)["pares"].nlargest(5, 'pases').reset_index()
+    df_conexiones.columns = ['Pasador', 'Receptor', 'Pases']
+    st.dataframe(df_conexiones, use_container_width=True)
+    
+    # Tabla 5: Red de pases de la temporada (métricas de cada jugador)
+    st.markdown("### 🕸️ Red de pases")
+    with instrumentacion.tramo("red temporada", cache=True):
+        metricas_temporada = red_pases.metricas_red(red_temporada(fuente))
+    st.dataframe(metricas_temporada.round(3), use_container_width=True, hide_index=True)
+
+    # Tendencias: ventanas de los últimos N partidos (equipo y jugadores) y tramos de 15 minutos
+    st.markdown("### 📈 Tendencias")
+    partidos_temporada = datos.partidos_disponibles(fuente)
+    n_forma = ventana_forma(len(partidos_temporada), "ventana_forma_equipo")
+    with instrumentacion.tramo("tendencias", cache=True) as t:
+        por_partido_temporada = tendencias_temporada(fuente)
+        forma_equipo = tendencias.forma_equipo(por_partido_temporada, partidos_temporada, n_forma)
+        forma_jugadores = tendencias.forma_jugadores(por_partido_temporada, n_forma)
+        t.filas = len(por_partido_temporada)
+    st.markdown("#### Equipo")
+    metricas_forma(forma_equipo)
+    with instrumentacion.tramo("tramos de 15 minutos", cache=True):
+        por_minuto = tendencias_por_minuto(fuente)
+    st.caption("Por tramo de 15 minutos (promedio por partido)")
+    st.bar_chart(por_minuto[["recuperaciones", "perdidas", "tiros"]].rename(columns=tendencias.SERIES),
+                 stack=False, sort=False, x_label="Minutos")
+
+    # Una fila por jugador: valor en su última ventana y la serie completa como sparkline
+    st.markdown("#### Jugadores")
+    series = forma_jugadores.groupby("jugador", sort=True).agg(
+        partidos=("partido", "size"),
+        precision=("precision_pases", "last"),
+        forma_precision=("precision_pases", lambda s: s.round(1).tolist()),
+        recuperaciones=("recuperaciones", "last"),
+        forma_recuperaciones=("recuperaciones", lambda s: s.round(2).tolist()),
+        perdidas=("perdidas", "last"),
+        forma_perdidas=("perdidas", lambda s: s.round(2).tolist()),
+    ).reset_index()
+    st.dataframe(
+        series,
+        use_container_width=True,
+        hide_index=True,
+        column_config={
+            "jugador": "Jugador",
+            "partidos": "Partidos",
+            "precision": st.column_config.NumberColumn("Precisión (%)", format="%.1f"),
+            "forma_precision": st.column_config.LineChartColumn("Forma precisión", y_min=0, y_max=100),
+            "recuperaciones": st.column_config.NumberColumn("Recup. por partido", format="%.2f"),
+            "forma_recuperaciones": st.column_config.LineChartColumn("Forma recuperaciones", y_min=0),
+            "perdidas": st.column_config.NumberColumn("Pérd. por partido", format="%.2f"),
+            "forma_perdidas": st.column_config.LineChartColumn("Forma pérdidas", y_min=0),
+        },
+    )
+
+# Página de Análisis de Equipo
+elif st.session_state.page == "equipo":
+    st.subheader("Análisis de Equipo")
+    
+    # Filtro de rival
+    rival = st.selectbox("Seleccionar rival", sorted(datos.partidos_disponibles(fuente)))
+    
+    # Cargar solo el partido seleccionado
+    with instrumentacion.tramo("carga partido", cache=True) as t:
+        df_rival = cargar_datos(fuente, (rival,))
+        t.filas = len(df_rival)
+    
+    if not df_rival.empty:
+        st.markdown(f"### Red de Pases vs {rival}")
+        
+        # --- 3. Filtrar solo pases completados para la red ---
+        passes = df_rival[df_rival["Event"] == "PB"].dropna(subset=["X", "Y", "X2", "Y2"])
+        
+        if not passes.empty:
+            
+            with instrumentacion.tramo("red de pases", cache=True):
+                # --- 4-6. Red de pases del partido (cacheada): posiciones promedio y conexiones ---
+                red = red_partido(fuente, rival)
+                avg_pos = red_pases.posiciones(red)
+                pass_counts = red_pases.aristas(red, avg_pos)
+            
+            # --- 7. Orientación cancha ---
+            avg_pos, pass_counts, espejado = red_pases.orientar(avg_pos, pass_counts)
+            if espejado:
+                # Espejar para heatmap y zonas (columnas nuevas: los eventos cargados no se modifican)
+                passes = passes.assign(**{c: 100 - passes[c] for c in datos.COLUMNAS_COORD})
+            
+            def dibujar_red():
+                import graficos
+
+                # --- 8-11. Cancha, conexiones (verdes) y nodos ---
+                return graficos.figura_red(avg_pos, pass_counts, "green")
+
+            # Lugar del gráfico (se dibuja al final, después de las tablas y métricas)
+            lugar_red = reservar_figura()
+
+            # ========================
+            # 🔥 Heatmap Zonal de Pases
+            # ========================
+            st.markdown("### 🔥 Mapa de calor zonal de pases")
+
+            # Rejilla de zonas (3x3 por defecto, carriles de juego de posición, 6x4 o bordes propios)
+            nombre_rejilla = st.selectbox("Rejilla de zonas", list(zonas.REJILLAS) + ["Personalizada"])
+            if nombre_rejilla == "Personalizada":
+                col1, col2 = st.columns(2)
+                with col1:
+                    bordes_x = st.text_input("Bordes X (largo)", "0, 25, 50, 75, 100")
+                with col2:
+                    bordes_y = st.text_input("Bordes Y (ancho)", "0, 50, 100")
+                try:
+                    rejilla = zonas.rejilla_personalizada(
+                        [b for b in bordes_x.split(",") if b.strip()],
+                        [b for b in bordes_y.split(",") if b.strip()],
+                    )
+                except ValueError as e:
+                    st.warning(f"Rejilla inválida ({e}), se usa 3x3")
+                    rejilla = zonas.REJILLAS["3x3"]
+            else:
+                rejilla = zonas.REJILLAS[nombre_rejilla]
+
+            # Zona de inicio y fin de cada pase, calculadas una sola vez para el mapa y las tablas
+            with instrumentacion.tramo("zonas", filas=len(passes)):
+                zonas_pases = zonas.zonificar(passes, rejilla)
+
+            def dibujar_heatmap():
+                import graficos
+
+                heatmap = zonas.conteo_por_zona(zonas_pases["inicio"], rejilla)
+                return graficos.figura_heatmap(heatmap, rejilla.bordes_x, rejilla.bordes_y)
+
+            lugar_heatmap = reservar_figura()
+
+            # Tabla de conteo por zona de inicio
+            st.dataframe(zonas.tabla_por_zona(zonas_pases["inicio"], rejilla), use_container_width=True)
+
+            # Transiciones zona de inicio -> zona de fin
+            with st.expander("Transiciones entre zonas (inicio → fin)"):
+                transiciones = zonas.matriz_transiciones(zonas_pases["inicio"], zonas_pases["fin"], rejilla)
+                st.dataframe(transiciones.loc[transiciones.sum(axis=1) > 0, transiciones.sum(axis=0) > 0],
+                             use_container_width=True)
+            
+            # ========================
+            # 🔎 Eventos por región
+            # ========================
+            st.markdown("### 🔎 Eventos por región")
+            st.caption("Coordenadas tal como se registraron (sin espejar)")
+
+            TIPOS_EVENTO = {
+                "Pases completados": ["PB"],
+                "Pases errados": ["PM"],
+                "Recuperaciones": ["Recuperacion"],
+                "Pérdidas": ["Perdida"],
+            }
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                tipo_evento = st.selectbox("Eventos", list(TIPOS_EVENTO))
+            es_pase = tipo_evento.startswith("Pases")
+            with col2:
+                formas = ["Zona", "Rectángulo", "Radio"] + (["Corredor entre zonas"] if es_pase else [])
+                forma_region = st.selectbox("Región", formas)
+            with col3:
+                alcance = st.radio("Alcance", ["Este partido", "Toda la temporada"], horizontal=True)
+
+            nombres_zonas = rejilla.etiquetas()
+            extremo = "inicio"
+            if forma_region in ("Zona", "Rectángulo", "Radio") and es_pase:
+                extremo = st.radio("Extremo del pase", ["inicio", "fin"], horizontal=True)
+            if forma_region == "Zona":
+                zona_sel = st.selectbox("Zona", range(rejilla.n_zonas), format_func=nombres_zonas.__getitem__)
+                parametros_region = (zona_sel,)
+            elif forma_region == "Rectángulo":
+                col1, col2 = st.columns(2)
+                with col1:
+                    rango_x = st.slider("X (largo)", 0, 100, (67, 100))
+                with col2:
+                    rango_y = st.slider("Y (ancho)", 0, 100, (0, 100))
+                parametros_region = rango_x + rango_y
+            elif forma_region == "Radio":
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    centro_x = st.slider("Centro X", 0, 100, 90)
+                with col2:
+                    centro_y = st.slider("Centro Y", 0, 100, 50)
+                with col3:
+                    radio_region = st.slider("Radio", 1, 50, 10)
+                parametros_region = (centro_x, centro_y, radio_region)
+            else:
+                col1, col2 = st.columns(2)
+                with col1:
+                    zona_origen = st.selectbox("Desde", range(rejilla.n_zonas), format_func=nombres_zonas.__getitem__)
+                with col2:
+                    zona_destino = st.selectbox("Hasta", range(rejilla.n_zonas), index=rejilla.n_zonas - 1,
+                                                format_func=nombres_zonas.__getitem__)
+                parametros_region = (zona_origen, zona_destino)
+
+            with instrumentacion.tramo("índice espacial", cache=True):
+                indice = indice_temporada(fuente)
+            with instrumentacion.tramo("consulta región") as t:
+                if forma_region == "Zona":
+                    filas = indice.zona(zona_sel, rejilla, extremo)
+                elif forma_region == "Rectángulo":
+                    filas = indice.rectangulo(*parametros_region, extremo=extremo)
+                elif forma_region == "Radio":
+                    filas = indice.radio(*parametros_region, extremo=extremo)
+                else:
+                    filas = indice.corredor_zonas(zona_origen, zona_destino, rejilla)
+                eventos_region = cargar_datos(fuente).iloc[filas].sort_index()
+                eventos_region = eventos_region[eventos_region["Event"].isin(TIPOS_EVENTO[tipo_evento])]
+                if alcance == "Este partido":
+                    eventos_region = eventos_region[eventos_region["Partido"] == rival]
+                t.filas = len(filas)
+
+            def dibujar_region():
+                from matplotlib.patches import Circle, Rectangle
+                from mplsoccer import Pitch
+                import graficos
+
+                pitch = Pitch(pitch_type="opta", line_color="black", pitch_color="white")
+                fig, ax = pitch.draw(figsize=(8, 6))
+                if es_pase:
+                    graficos.dibujar_pases(eventos_region, ax, pitch)
+                else:
+                    color = "green" if tipo_evento == "Recuperaciones" else "red"
+                    pitch.scatter(eventos_region["X"], graficos.invertir_y(eventos_region["Y"]),
+                                  c=color, s=25, alpha=0.5, ax=ax)
+                # Contorno de la región (con Y invertida, como los eventos)
+                if forma_region == "Radio":
+                    ax.add_patch(Circle((centro_x, 100 - centro_y), radio_region, fill=False, ls="--", lw=1.5))
+                else:
+                    if forma_region == "Rectángulo":
+                        rectangulos = [parametros_region]
+                    else:
+                        rectangulos = []
+                        for codigo in parametros_region:
+                            ix, iy = divmod(codigo, rejilla.forma[1])
+                            rectangulos.append((rejilla.bordes_x[ix], rejilla.bordes_x[ix + 1],
+                                                rejilla.bordes_y[iy], rejilla.bordes_y[iy + 1]))
+                    for x0, x1, y0, y1 in rectangulos:
+                        ax.add_patch(Rectangle((x0, 100 - y1), x1 - x0, y1 - y0, fill=False, ls="--", lw=1.5))
+                return fig
+
+            st.metric("Eventos en la región", len(eventos_region))
+            lugar_region = reservar_figura()
+            por_jugador = eventos_region["Player"].astype(str).value_counts().rename_axis("Jugador").reset_index(name="Eventos")
+            st.dataframe(por_jugador, use_container_width=True, hide_index=True)
+            
+            # ========================
+            # 🔁 Posesiones
+            # ========================
+            st.markdown("### 🔁 Posesiones")
+            with instrumentacion.tramo("posesiones", cache=True):
+                tabla_posesiones = posesiones_temporada(fuente)[0]
+                tabla_posesiones = tabla_posesiones[tabla_posesiones["partido"] == rival]
+                resumen_posesiones = posesiones.resumen(tabla_posesiones)
+            col1, col2, col3, col4 = st.columns(4)
+            with col1:
+                st.metric("Posesiones", resumen_posesiones["posesiones"])
+            with col2:
+                st.metric("Eventos por posesión", f"{resumen_posesiones['eventos_promedio']:.1f}")
+            with col3:
+                st.metric("Duración media", f"{resumen_posesiones['duracion_promedio']:.0f} s")
+            with col4:
+                st.metric("Progresión media (X)", f"{resumen_posesiones['progresion_promedio']:.1f}")
+            st.write(f"Terminan en tiro: **{resumen_posesiones['terminan_en_tiro']:.1f}%** · "
+                     f"en pérdida o pase errado: **{resumen_posesiones['terminan_en_perdida']:.1f}%**")
+
+            col1, col2 = st.columns(2)
+            with col1:
+                st.markdown("#### Cómo terminan")
+                finales = tabla_posesiones["evento_final"].value_counts()
+                st.dataframe(finales[finales > 0].rename_axis("Evento").reset_index(name="Posesiones"),
+                             use_container_width=True, hide_index=True)
+            with col2:
+                st.markdown("#### Posesiones más largas")
+                largas = tabla_posesiones.nlargest(5, "eventos")[["minuto", "eventos", "pases", "progresion_x", "evento_final"]]
+                largas.columns = ["Minuto", "Eventos", "Pases", "Progresión X", "Final"]
+                st.dataframe(largas.astype({"Minuto": "Int64"}), use_container_width=True, hide_index=True)
+            
+            # Estadísticas adicionales
+            st.markdown("### Estadísticas del Partido")
+            
+            # Calcular pases totales (correctos e incorrectos)
+            total_pases_correctos = len(passes)
+            total_pases_incorrectos = len(df_rival[df_rival["Event"] == "PM"])
+            total_pases = total_pases_correctos + total_pases_incorrectos
+            
+            # Top 3 conexiones de pases y jugador más participativo (quien dio más pases), desde la red
+            top_conexiones = red_pases.conexiones_clave(red, 3)
+            jugador_mas_participativo, max_pases = red_pases.jugador_mas_participativo(red)
+            
+            # Mostrar estadísticas
+            st.markdown("#### 📊 Posesión")
+            col1, col2 = st.columns(2)
+            with col1:
+                st.metric("Pases totales", f"{total_pases_correctos}/{total_pases}")
+            with col2:
+                porcentaje_efectividad = (total_pases_correctos / total_pases * 100) if total_pases > 0 else 0
+                st.metric("Efectividad", f"{porcentaje_efectividad:.1f}%")
+            
+            
+            # Top 3 conexiones
+            st.markdown("#### 🔗 Top 3 Conexiones de Pases")
+            for i, (_, row) in enumerate(top_conexiones.iterrows(), 1):
+                st.write(f"{i}. **{row['Player']}** → **{row['recep']}**: {row['pass_count']} pases")
+            
+            # Jugador más participativo
+            st.markdown("#### ⭐ Jugador Más Participativo")
+            st.write(f"**{jugador_mas_participativo}** con {max_pases} pases")
+            
+            # Métricas de la red
+            st.markdown("#### 🕸️ Métricas de la Red")
+            st.dataframe(red_pases.metricas_red(red).round(3), use_container_width=True, hide_index=True)
+            
+            # Figuras al final: las tablas y métricas ya están en pantalla
+            mostrar_figura(("equipo", "red", rival), dibujar_red, lugar_red)
+            mostrar_figura(("equipo", "heatmap", rival, rejilla), dibujar_heatmap, lugar_heatmap)
+            mostrar_figura(("equipo", "region", rival, rejilla, tipo_evento, forma_region, extremo, alcance)
+                           + parametros_region, dibujar_region, lugar_region)
+        else:
+            st.warning(f"No hay pases completados registrados para el partido vs {rival}")
+    else:
+        st.warning("No hay datos disponibles para el rival seleccionado")
+
+# Página de Comparación (N jugadores x M partidos)
+elif st.session_state.page == "comparacion":
+    st.subheader("Comparación")
+
+    with instrumentacion.tramo("carga", cache=True) as t:
+        df = cargar_datos(fuente)
+        t.filas = len(df)
+
+    # Por defecto los últimos partidos y los jugadores con más pases de la temporada
+    todos_partidos = datos.partidos_disponibles(fuente)
+    df_stats = estadisticas_jugadores(fuente)
+    col1, col2 = st.columns(2)
+    with col1:
+        partidos_sel = st.multiselect("Partidos", todos_partidos, default=todos_partidos[-3:])
+    with col2:
+        jugadores_sel = st.multiselect("Jugadores", sorted(df_stats["jugador"]),
+                                       default=sorted(df_stats.nlargest(4, "total_pases")["jugador"]))
+
+    if not partidos_sel or not jugadores_sel:
+        st.info("Elegí al menos un jugador y un partido")
+    else:
+        # Métricas de todas las combinaciones en una sola agrupación
+        with instrumentacion.tramo("tabla comparación") as t:
+            tabla = comparacion.tabla_comparacion(df, jugadores_sel, partidos_sel)
+            t.filas = len(tabla)
+        tabla["pases"] = tabla["pases_correctos"].astype(str) + "/" + tabla["total_pases"].astype(str)
+        tabla["precision"] = tabla["porcentaje_pases"].round(1).astype(str) + "%"
+        tabla["tiros"] = tabla["tiros_al_arco"].astype(str) + "/" + tabla["total_tiros"].astype(str)
+        tabla_display = tabla[["jugador", "partido", "pases", "precision", "pelotas_recuperadas",
+                               "pelotas_perdidas", "tiros", "goles"]]
+        tabla_display.columns = ["Jugador", "Partido", "Pases", "Precisión", "Recuperadas", "Perdidas",
+                                 "Tiros", "Goles"]
+        st.dataframe(tabla_display, use_container_width=True, hide_index=True)
+
+        # Grilla de mapas: una fila por jugador, una columna por partido
+        st.markdown("### 🗺️ Mapas de pases, recuperaciones y pérdidas")
+        lugares = {}
+        for jugador in jugadores_sel:
+            for columna, partido in zip(st.columns(len(partidos_sel)), partidos_sel):
+                lugares[jugador, partido] = columna.empty()
+                lugares[jugador, partido].caption(f"{jugador} vs {partido}: cargando…")
+
+        cache = cache_figuras()
+        with instrumentacion.tramo("mapas comparación", cache=True) as t:
+            tareas = comparacion.tareas_mapas(df, jugadores_sel, partidos_sel)
+            pendientes = {}
+            for clave, args in tareas.items():
+                png = cache.obtener(("comparacion",) + clave + (fuente,))
+                if png is None:
+                    pendientes[clave] = args
+                else:
+                    lugares[clave].image(png, use_container_width=True)
+            # Solo las figuras que faltan van al pool; se muestran a medida que terminan
+            if pendientes:
+                instrumentacion.marcar_fallo()
+                for clave, png in comparacion.dibujar_en_paralelo(pool_comparacion(), pendientes):
+                    cache.guardar(("comparacion",) + clave + (fuente,), png)
+                    lugares[clave].image(png, use_container_width=True)
+            for clave in lugares.keys() - tareas.keys():
+                lugares[clave].caption(f"{clave[0]} no jugó vs {clave[1]}")
+            t.filas = len(pendientes)
+
+# Página de Partido en vivo
+elif st.session_state.page == "en_vivo":
+    st.subheader("Partido en vivo")
+
+    NUEVO_PARTIDO = "Nuevo partido…"
+
+    def empezar_partido():
+        # Corre antes del rerun: crea el registro y deja el partido elegido en el selector
+        nombre = st.session_state.rival_en_vivo.strip().title()
+        existente = en_vivo.partido_existente(nombre) if nombre else None
+        if existente is not None:
+            # Al ingerirlo quedarían dos partidos con el mismo nombre
+            st.session_state.aviso_en_vivo = f"Ya hay un partido contra {nombre} ({existente.name})"
+        elif nombre:
+            partido_en_vivo(nombre)
+            st.session_state.partido_en_vivo = nombre
+
+    eleccion = st.selectbox("Partido", en_vivo.partidos_en_curso() + [NUEVO_PARTIDO], key="partido_en_vivo")
+    rival = None
+    if eleccion == NUEVO_PARTIDO:
+        col1, col2 = st.columns([3, 1])
+        with col1:
+            st.text_input("Rival", key="rival_en_vivo")
+        with col2:
+            st.write("")
+            st.button("Empezar", use_container_width=True, on_click=empezar_partido)
+        if "aviso_en_vivo" in st.session_state:
+            st.error(st.session_state.pop("aviso_en_vivo"))
+    else:
+        rival = eleccion
+
+    if rival:
+        registro, estado = partido_en_vivo(rival)
+        plantel = sorted(set(estadisticas_jugadores(fuente)["jugador"]) | set(estado.estadisticas()["jugador"]))
+
+        # Carga de eventos: Enter en cualquier campo agrega el evento; los valores quedan para el siguiente
+        with st.form("evento_en_vivo"):
+            col1, col2, col3, col4 = st.columns(4)
+            with col1:
+                jugador = st.selectbox("Jugador", plantel, accept_new_options=True)
+            with col2:
+                evento = st.selectbox("Evento", datos.EVENTOS)
+            with col3:
+                minuto = st.number_input("Min", 0, datos.MAXIMOS_TIEMPO["Mins"], 0)
+            with col4:
+                segundo = st.number_input("Seg", 0, datos.MAXIMOS_TIEMPO["Secs"], 0)
+            col1, col2, col3, col4 = st.columns(4)
+            with col1:
+                x = st.number_input("X", 0, 100, None)
+            with col2:
+                y = st.number_input("Y", 0, 100, None)
+            with col3:
+                x2 = st.number_input("X2", 0, 100, None)
+            with col4:
+                y2 = st.number_input("Y2", 0, 100, None)
+            col1, col2 = st.columns(2)
+            with col1:
+                receptor = st.selectbox("Receptor", [""] + plantel)
+            with col2:
+                resultado = st.selectbox("Resultado", ("",) + datos.RESULTADOS)
+            if st.form_submit_button("Agregar evento", use_container_width=True):
+                registro.agregar({
+                    "Team": en_vivo.EQUIPO, "Player": jugador, "Event": evento, "Mins": minuto, "Secs": segundo,
+                    "X": x, "Y": y, "X2": x2, "Y2": y2, "recep": receptor, "Result": resultado,
+                })
+
+        actualizacion_automatica = st.checkbox("Actualizar cada 5 s (para quien mira desde otra sesión)")
+
+        @st.fragment(run_every="5s" if actualizacion_automatica else None)
+        def panel_en_vivo():
+            # Solo se leen y suman los eventos nuevos del registro
+            registro.sincronizar(solo_si_vencio=True)
+            with instrumentacion.tramo("actualización en vivo") as t:
+                t.filas = estado.actualizar(registro)
+
+            stats_partido = estado.estadisticas()
+            totales = stats_partido.sum(numeric_only=True)
+            st.markdown(f"### {en_vivo.EQUIPO} vs {rival} · {estado.eventos} eventos")
+            col1, col2, col3, col4 = st.columns(4)
+            with col1:
+                st.metric("Pases totales", f"{int(totales['pases_correctos'])}/{int(totales['total_pases'])}")
+            with col2:
+                efectividad = (totales["pases_correctos"] / totales["total_pases"] * 100) if totales["total_pases"] > 0 else 0
+                st.metric("Efectividad", f"{efectividad:.1f}%")
+            with col3:
+                st.metric("Tiros", f"{int(totales['tiros_al_arco'])}/{int(totales['total_tiros'])}")
+            with col4:
+                st.metric("Recuperadas / Perdidas",
+                          f"{int(totales['pelotas_recuperadas'])}/{int(totales['pelotas_perdidas'])}")
+
+            lugar_red_vivo = reservar_figura()
+            rejilla_vivo = zonas.REJILLAS[st.selectbox("Rejilla de zonas", list(zonas.REJILLAS), key="rejilla_en_vivo")]
+            lugar_heatmap_vivo = reservar_figura()
+            st.dataframe(
+                stats_partido[["jugador", "pases_correctos", "total_pases", "pelotas_recuperadas",
+                               "pelotas_perdidas", "total_tiros", "goles"]],
+                use_container_width=True, hide_index=True,
+            )
+
+            def dibujar_red_vivo():
+                import graficos
+
+                return graficos.figura_red(*estado.red_orientada(), "green")
+
+            def dibujar_heatmap_vivo():
+                import graficos
+
+                return graficos.figura_heatmap(estado.conteo_por_zona(rejilla_vivo),
+                                               rejilla_vivo.bordes_x, rejilla_vivo.bordes_y)
+
+            # Las figuras se redibujan solo si llegaron pases completados nuevos
+            if estado.red.number_of_edges():
+                mostrar_figura(("en_vivo", "red", rival, estado.version_pases), dibujar_red_vivo, lugar_red_vivo)
+            else:
+                lugar_red_vivo.caption("Todavía no hay pases completados con receptor")
+            mostrar_figura(("en_vivo", "heatmap", rival, estado.version_pases, rejilla_vivo),
+                           dibujar_heatmap_vivo, lugar_heatmap_vivo)
+
+        panel_en_vivo()
+
+        st.markdown("---")
+        if st.button("Cerrar partido"):
+            try:
+                final = en_vivo.cerrar_partido(registro)
+            except FileExistsError as e:
+                st.error(str(e))
+            else:
+                partido_en_vivo.clear(rival)
+                st.success(f"Partido guardado en {final.name}; con almacén, correr `python datos.py` para ingerirlo")
+
+
+# Panel de tiempos: se arma al final, cuando ya se midieron todas las etapas de la página
+if instrumentacion.activo():
+    if ruta_log_tiempos:
+        instrumentacion.escribir_log(ruta_log_tiempos, pagina=st.session_state.page)
+    if panel_tiempos:
+        tiempos = pd.DataFrame(instrumentacion.tramos())
+        with st.sidebar.expander("⏱️ Tiempos", expanded=True):
+            if tiempos.empty:
+                st.caption("Sin tramos medidos")
+            else:
+                tiempos["Etapa"] = ["\u00a0\u00a0" * n + t for n, t in zip(tiempos["nivel"], tiempos["tramo"])]
+                tiempos["ms"] = (tiempos["segundos"] * 1000).round(1)
+                tiempos["Filas"] = tiempos["filas"].astype("Int64")
+                tiempos["Cache"] = tiempos["cache"].fillna("")
+                st.dataframe(tiempos[["Etapa", "ms", "Filas", "Cache"]], use_container_width=True, hide_index=True)
+                st.caption(f"Total: {tiempos.loc[tiempos['nivel'] == 0, 'ms'].sum():.1f} ms")
@@ -0,0 +1,144 @@
+"""Red de pases como grafo dirigido y ponderado (networkx).
+
+Nodos: jugadores, con la suma de coordenadas de inicio de sus pases (para la
+posición promedio) y la cantidad de pases dados. Aristas: pasador -> receptor
+con la cantidad de pases completados como peso. Todos los atributos son sumas,
+así que las redes de varios partidos se combinan sumando, sin volver a los
+eventos crudos.
+"""
+
+import networkx as nx
+import pandas as pd
+
+
+def construir_red(pases):
+    """Red de un conjunto de pases completados (``Event == "PB"``) con coordenadas."""
+    G = nx.DiGraph()
+    nodos = pases.groupby("Player", observed=True).agg(
+        suma_x=("X", "sum"), suma_y=("Y", "sum"), pases=("X", "size")
+    )
+    for jugador, fila in nodos.iterrows():
+        G.add_node(str(jugador), suma_x=float(fila["suma_x"]), suma_y=float(fila["suma_y"]), pases=int(fila["pases"]))
+
+    pares = pases.groupby(["Player", "recep"], observed=True).size()
+    G.add_edges_from((str(p), str(r), {"weight": int(n)}) for (p, r), n in pares.items() if n > 0)
+    _actualizar_distancias(G)
+    return G
+
+
+def combinar_redes(redes):
+    """Suma redes de varios partidos (nodos y aristas)."""
+    G = nx.DiGraph()
+    for red in redes:
+        _sumar(G, red)
+    _actualizar_distancias(G)
+    return G
+
+
+def acumular_red(G, red):
+    """Suma ``red`` a ``G`` en el lugar (p. ej. los pases nuevos de un partido en vivo) y devuelve ``G``."""
+    _sumar(G, red)
+    _actualizar_distancias(G)
+    return G
+
+
+def _sumar(G, red):
+    for jugador, attrs in red.nodes(data=True):
+        if jugador not in G:
+            G.add_node(jugador)
+        nodo = G.nodes[jugador]
+        for clave in ("suma_x", "suma_y", "pases"):
+            nodo[clave] = nodo.get(clave, 0) + attrs.get(clave, 0)
+    for pasador, receptor, attrs in red.edges(data=True):
+        peso = G.edges[pasador, receptor]["weight"] if G.has_edge(pasador, receptor) else 0
+        G.add_edge(pasador, receptor, weight=peso + attrs["weight"])
+
+
+def _actualizar_distancias(G):
+    # Para caminos más cortos: más pases entre dos jugadores = más "cerca"
+    for _, _, attrs in G.edges(data=True):
+        attrs["distancia"] = 1 / attrs["weight"]
+
+
+def posiciones(G):
+    """Posición promedio y pases con receptor de cada jugador que dio al menos un pase."""
+    filas = [
+        {
+            "Player": jugador,
+            "X": attrs["suma_x"] / attrs["pases"],
+            "Y": attrs["suma_y"] / attrs["pases"],
+            "count": G.out_degree(jugador, weight="weight"),
+        }
+        for jugador, attrs in G.nodes(data=True)
+        if attrs.get("pases")
+    ]
+    return pd.DataFrame(filas, columns=["Player", "X", "Y", "count"]).sort_values("Player", ignore_index=True)
+
+
+def aristas(G, pos=None):
+    """Conexiones con la posición de ambos extremos (solo entre jugadores con posición)."""
+    if pos is None:
+        pos = posiciones(G)
+    conexiones = pd.DataFrame(
+        [(p, r, attrs["weight"]) for p, r, attrs in G.edges(data=True)],
+        columns=["Player", "recep", "pass_count"],
+    ).sort_values(["Player", "recep"], ignore_index=True)
+    conexiones = conexiones.merge(pos, on="Player")
+    return conexiones.merge(pos, left_on="recep", right_on="Player", suffixes=["", "_end"])
+
+
+def orientar(pos, conexiones):
+    """Posiciones y conexiones listas para dibujar: Y invertida y, si el arquero quedó a la derecha, espejadas.
+
+    Devuelve ``(pos, conexiones, espejado)``; con ``espejado`` hay que espejar también los pases que se dibujen encima.
+    """
+    pos, conexiones = pos.copy(), conexiones.copy()
+    pos["Y"] = 100 - pos["Y"]
+    conexiones["Y"] = 100 - conexiones["Y"]
+    conexiones["Y_end"] = 100 - conexiones["Y_end"]
+    espejado = bool(pos["X"].min() > 50)
+    if espejado:
+        pos["X"] = 100 - pos["X"]
+        conexiones["X"] = 100 - conexiones["X"]
+        conexiones["X_end"] = 100 - conexiones["X_end"]
+    return pos, conexiones, espejado
+
+
+def conexiones_clave(G, n=3):
+    """Las ``n`` conexiones pasador -> receptor con más pases."""
+    conexiones = pd.DataFrame(
+        [(p, r, attrs["weight"]) for p, r, attrs in G.edges(data=True)],
+        columns=["Player", "recep", "pass_count"],
+    ).sort_values(["Player", "recep"], ignore_index=True)
+    return conexiones.nlargest(n, "pass_count")
+
+
+def jugador_mas_participativo(G):
+    """(jugador, pases) de quien dio más pases, o ("N/A", 0) si la red está vacía."""
+    pases = {jugador: attrs.get("pases", 0) for jugador, attrs in G.nodes(data=True)}
+    if not pases:
+        return "N/A", 0
+    jugador = max(sorted(pases), key=pases.get)
+    return jugador, pases[jugador]
+
+
+def metricas_red(G):
+    """Métricas por jugador calculadas en bloque sobre todo el grafo."""
+    if G.number_of_nodes() == 0:
+        return pd.DataFrame(columns=["Jugador", "Pases", "Recepciones", "Centralidad", "Intermediación", "Clustering"])
+    peso_total = G.size(weight="weight") or 1
+    intermediacion = nx.betweenness_centrality(G, weight="distancia")
+    clustering = nx.clustering(G, weight="weight")
+    filas = [
+        {
+            "Jugador": jugador,
+            "Pases": G.out_degree(jugador, weight="weight"),
+            "Recepciones": G.in_degree(jugador, weight="weight"),
+            # Parte de todos los pases de la red en los que participa (como pasador o receptor)
+            "Centralidad": G.degree(jugador, weight="weight") / (2 * peso_total),
+            "Intermediación": intermediacion[jugador],
+            "Clustering": clustering[jugador],
+        }
+        for jugador in G.nodes
+    ]
+    return pd.DataFrame(filas).sort_values("Centralidad", ascending=False, ignore_index=True)
@@ -0,0 +1,120 @@
+"""Generador de partidos sintéticos con el esquema de los CSV reales.
+
+Sirve para medir cómo escala la app con temporadas completas y varios
+equipos. La mezcla de eventos, los resultados y la cantidad de eventos por
+partido imitan a los partidos cargados (Midland, Sportivo Italiano)::
+
+    python sintetico.py DIRECTORIO --partidos 40 [--equipos 2] [--semilla 0]
+"""
+
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Frecuencia relativa de cada evento en los partidos reales
+MEZCLA_EVENTOS = {
+    "PB": 272, "PM": 104, "Recuperacion": 100, "Perdida": 83, "Lateral": 21, "Tiro": 18,
+    "Interceptacion": 14, "Corner": 8, "Centro": 11, "Falta recibida": 10, "Falta": 9,
+    "TL": 12, "Atajada": 7, "Saque de arco": 5, "DG": 6, "OC": 3, "Asistencia": 2,
+    "DP": 1, "Tiro recibido": 1,
+}
+RESULTADOS = {
+    "Tiro": (["Arco", "Block", "Gol", "Fuera"], [0.35, 0.3, 0.15, 0.2]),
+    "Lateral": (["Si", "No", "Ganado", "Perdido"], [0.5, 0.3, 0.1, 0.1]),
+    "Corner": (["Si", "No"], [0.4, 0.6]),
+    "Centro": (["Block", "Si", "No"], [0.4, 0.3, 0.3]),
+}
+# Eventos con coordenadas de destino (el resto lleva "-" en X2/Y2)
+CON_DESTINO = {"PB", "PM", "Lateral", "Centro", "TL", "Corner", "Tiro"}
+NOMBRES = [
+    "Ayala", "Bustos", "Chiarelli", "Escobar", "Gallardo", "Hancevic", "Julve", "Lujan",
+    "Millaci", "Muriano", "Ongaro", "Vives", "Zapata", "Acosta", "Benitez", "Castro",
+    "Diaz", "Ferreyra", "Gomez", "Herrera", "Ibarra", "Juarez", "Ledesma", "Medina",
+]
+
+
+def plantel(rng, tamano=16, sufijo=""):
+    return [nombre + sufijo for nombre in rng.choice(NOMBRES, size=tamano, replace=False)]
+
+
+def generar_partido(rng, equipo="Excursio", jugadores=None, rival="Rival", n_eventos=None):
+    """Un partido en el formato del CSV (todas las columnas como texto, igual que los originales)."""
+    jugadores = jugadores or plantel(rng)
+    n = n_eventos or int(rng.integers(300, 380))
+    eventos = np.array(list(MEZCLA_EVENTOS))
+    pesos = np.array(list(MEZCLA_EVENTOS.values()), dtype=float)
+    evento = rng.choice(eventos, size=n, p=pesos / pesos.sum())
+
+    # Tiempo creciente a lo largo de ~95 minutos
+    segundos = np.sort(rng.integers(0, 95 * 60, size=n))
+    # Los titulares (primeros 11) participan más que los suplentes
+    peso_jugador = np.r_[np.full(11, 3.0), np.ones(len(jugadores) - 11)]
+    jugador = rng.choice(jugadores, size=n, p=peso_jugador / peso_jugador.sum())
+
+    x = rng.integers(0, 101, size=n)
+    y = rng.integers(0, 101, size=n)
+    x2 = np.clip(x + rng.normal(8, 18, size=n), 0, 100).astype(int)
+    y2 = np.clip(y + rng.normal(0, 20, size=n), 0, 100).astype(int)
+    con_destino = np.isin(evento, list(CON_DESTINO))
+
+    receptor = rng.choice(jugadores, size=n, p=peso_jugador / peso_jugador.sum())
+    receptor = np.where(receptor == jugador, np.roll(receptor, 1), receptor)
+    con_receptor = (evento == "PB") & (rng.random(n) > 0.02)
+
+    resultado = np.full(n, "", dtype=object)
+    for ev, (valores, probs) in RESULTADOS.items():
+        mascara = evento == ev
+        resultado[mascara] = rng.choice(valores, size=mascara.sum(), p=probs)
+
+    df = pd.DataFrame({
+        "Team": equipo,
+        "Player": jugador,
+        "Event": evento,
+        "Mins": segundos // 60,
+        "Secs": segundos % 60,
+        "X": x,
+        "Y": y,
+        "X2": np.where(con_destino, x2.astype(str), "-"),
+        "Y2": np.where(con_destino, y2.astype(str), "-"),
+        "recep": np.where(con_receptor, receptor, ""),
+        "Result": resultado,
+    })
+    # Como en los CSV reales, algún evento del rival (goles en contra, tiros recibidos), sin jugador propio
+    df.loc[rng.choice(n, size=2, replace=False), ["Team", "Player", "recep"]] = [rival, "-", ""]
+    return df
+
+
+def generar_temporada(directorio, n_partidos, n_equipos=1, semilla=0):
+    """Escribe ``n_partidos`` CSV por equipo en ``directorio`` y devuelve sus rutas."""
+    rng = np.random.default_rng(semilla)
+    directorio = Path(directorio)
+    directorio.mkdir(parents=True, exist_ok=True)
+    equipos = ["Excursio"] + [f"Equipo {i}" for i in range(2, n_equipos + 1)]
+    rutas = []
+    for k, equipo in enumerate(equipos):
+        # Planteles disjuntos: en la misma carpeta, un jugador no suma partidos de dos equipos
+        jugadores = plantel(rng, sufijo=f" ({equipo})" if k else "")
+        for i in range(1, n_partidos + 1):
+            rival = f"Rival {i:03d}"
+            df = generar_partido(rng, equipo, jugadores, rival)
+            ruta = directorio / f"{equipo} vs {rival}.csv".lower()
+            df.to_csv(ruta, sep=";", index=False)
+            rutas.append(ruta)
+    return rutas
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generar partidos sintéticos en formato CSV.")
+    parser.add_argument("directorio", type=Path)
+    parser.add_argument("--partidos", type=int, default=40)
+    parser.add_argument("--equipos", type=int, default=1)
+    parser.add_argument("--semilla", type=int, default=0)
+    args = parser.parse_args()
+    rutas = generar_temporada(args.directorio, args.partidos, args.equipos, args.semilla)
+    print(f"{len(rutas)} partidos escritos en {args.directorio}")
+
+
+if __name__ == "__main__":
+    main()
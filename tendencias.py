@@ -0,0 +1,123 @@
+"""Forma y tendencias: métricas a lo largo de los partidos y de los minutos de juego.
+
+Las series salen de tablas de conteos (una fila por jugador y partido, o un
+histograma por minuto) y cada ventana móvil (últimos N partidos, tramos de
+15 minutos) es la diferencia de dos sumas acumuladas: el costo no depende del
+ancho de la ventana y no se vuelve a recorrer ningún evento.
+
+La línea de tiempo de partidos es el orden de la temporada que da
+``datos.partidos_disponibles`` (por la fecha en el nombre del CSV). Los
+minutos son los de la columna ``Mins`` tal como se registraron.
+"""
+
+import numpy as np
+import pandas as pd
+
+import agregados
+
+# Conteos que alimentan las series (las métricas derivadas salen de estos)
+CONTEOS = ["pases_correctos", "pases_incorrectos", "pelotas_recuperadas", "pelotas_perdidas", "total_tiros", "goles"]
+# Métricas de las series: precisión de pase (%) y promedios por partido
+SERIES = {
+    "precision_pases": "Precisión de pase (%)",
+    "recuperaciones": "Recuperaciones por partido",
+    "perdidas": "Pérdidas por partido",
+    "tiros": "Tiros por partido",
+    "goles": "Goles por partido",
+}
+
+
+def ventana(valores, grupos, n):
+    """Suma de las últimas ``n`` filas de cada grupo, fila por fila.
+
+    Las filas de un mismo grupo tienen que estar contiguas y en orden (``grupos``
+    es un código por fila). Devuelve las sumas y cuántas filas entraron en cada ventana.
+    """
+    valores = np.asarray(valores, dtype=np.float64)
+    if valores.ndim == 1:
+        valores = valores[:, None]
+    acumulado = np.zeros((len(valores) + 1, valores.shape[1]))
+    np.cumsum(valores, axis=0, out=acumulado[1:])
+    i = np.arange(len(valores))
+    # La ventana no pasa del comienzo de su grupo
+    cambios = np.flatnonzero(np.r_[True, grupos[1:] != grupos[:-1]]) if len(grupos) else np.empty(0, np.int64)
+    comienzo = np.repeat(cambios, np.diff(np.r_[cambios, len(valores)]))
+    desde = np.maximum(i + 1 - n, comienzo)
+    return acumulado[i + 1] - acumulado[desde], i + 1 - desde
+
+
+def _derivar(sumas, partidos, indice=None):
+    """Métricas de ``SERIES`` a partir de sumas de ``CONTEOS`` y de la cantidad de partidos que abarcan.
+
+    ``indice`` es el de las filas de origen, para que el resultado se pueda unir con ellas.
+    """
+    sumas = pd.DataFrame(sumas, columns=CONTEOS)
+    pases = sumas["pases_correctos"] + sumas["pases_incorrectos"]
+    partidos = np.maximum(np.asarray(partidos, dtype=np.float64), 1)
+    return pd.DataFrame({
+        "precision_pases": (sumas["pases_correctos"] / pases.where(pases > 0) * 100).to_numpy(),
+        "recuperaciones": sumas["pelotas_recuperadas"].to_numpy() / partidos,
+        "perdidas": sumas["pelotas_perdidas"].to_numpy() / partidos,
+        "tiros": sumas["total_tiros"].to_numpy() / partidos,
+        "goles": sumas["goles"].to_numpy() / partidos,
+    }, index=indice)
+
+
+def por_partido(df, partidos):
+    """Conteos por jugador y partido en el orden de ``partidos`` (columnas ``jugador``, ``partido``, ``orden``)."""
+    conteos = agregados.conteos_jugadores(df, por=("Player", "Partido"))[CONTEOS]
+    tabla = conteos.rename_axis(["jugador", "partido"]).reset_index()
+    orden = pd.Series(np.arange(len(partidos)), index=list(partidos))
+    tabla["orden"] = tabla["partido"].map(orden)
+    tabla = tabla.dropna(subset=["orden"]).astype({"orden": "int64"})
+    return tabla.sort_values(["jugador", "orden"], ignore_index=True)[["jugador", "partido", "orden"] + CONTEOS]
+
+
+def forma_jugadores(tabla, n):
+    """Métricas de ``SERIES`` de cada jugador en sus últimos ``n`` partidos jugados, después de cada partido.
+
+    ``tabla`` es la de ``por_partido``; sale una fila por jugador y partido.
+    """
+    grupos = pd.factorize(tabla["jugador"])[0]
+    sumas, partidos = ventana(tabla[CONTEOS].to_numpy(), grupos, n)
+    return pd.concat([tabla[["jugador", "partido", "orden"]], _derivar(sumas, partidos, tabla.index)], axis=1)
+
+
+def forma_equipo(tabla, partidos, n):
+    """Métricas de ``SERIES`` del equipo en los últimos ``n`` partidos, después de cada partido de ``partidos``."""
+    totales = tabla.groupby("orden")[CONTEOS].sum().reindex(range(len(partidos)), fill_value=0)
+    sumas, jugados = ventana(totales.to_numpy(), np.zeros(len(totales), dtype=np.int64), n)
+    base = pd.DataFrame({"partido": list(partidos)})
+    return pd.concat([base, _derivar(sumas, jugados, base.index)], axis=1)
+
+
+def por_minuto(df, ancho=15, paso=None):
+    """Métricas de ``SERIES`` por minuto de juego, promediadas por partido.
+
+    Cada fila es una ventana de ``ancho`` minutos; las ventanas avanzan de a
+    ``paso`` minutos (por defecto ``ancho``: tramos sin solaparse). El último
+    tramo puede ser más corto (45-47): sus conteos se llevan a ``ancho``
+    minutos para que se pueda comparar con los demás. El índice es el rango de
+    minutos de cada ventana.
+    """
+    paso = paso or ancho
+    df = agregados.eventos_de_jugadores(df)
+    minutos = df["Mins"].to_numpy("float64", na_value=np.nan)
+    validos = ~np.isnan(minutos)
+    if not validos.any():
+        return pd.DataFrame(columns=list(SERIES)).rename_axis("minutos")
+    minuto = minutos[validos].astype(np.int64).clip(0)
+    fin = int(minuto.max()) + 1
+
+    # Histograma minuto x conteo y sus sumas acumuladas: cada ventana es una resta
+    marcas = agregados.indicadores(df)[CONTEOS].to_numpy()[validos]
+    acumulado = np.zeros((fin + 1, len(CONTEOS)))
+    for j in range(len(CONTEOS)):
+        acumulado[1:, j] = np.cumsum(np.bincount(minuto, weights=marcas[:, j], minlength=fin))
+    desde = np.arange(0, max(fin - ancho, 0) + paso, paso)
+    desde = desde[desde < fin]
+    hasta = np.minimum(desde + ancho, fin)
+    sumas = (acumulado[hasta] - acumulado[desde]) * (ancho / (hasta - desde))[:, None]
+    resultado = _derivar(sumas, np.full(len(desde), df["Partido"].nunique()))
+    resultado.index = pd.Index([f"{d}-{h - 1}" if h - 1 > d else f"{d}" for d, h in zip(desde, hasta)], name="minutos")
+    return resultado
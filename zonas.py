@@ -0,0 +1,117 @@
+"""Zonas de la cancha (coordenadas Opta 0-100).
+
+Una ``Rejilla`` define los bordes en X (largo, de arco propio a arco rival) y
+en Y (ancho, de derecha a izquierda). Cada evento recibe un código de zona
+entero (``ix * n_y + iy``) calculado con ``np.digitize`` en una sola pasada.
+El mapa de calor, el conteo por zona y la matriz de transiciones salen de
+esos mismos códigos.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+
+@dataclass(frozen=True)
+class Rejilla:
+    nombre: str
+    bordes_x: tuple
+    bordes_y: tuple
+    etiquetas_x: tuple
+    etiquetas_y: tuple
+
+    @property
+    def forma(self):
+        return len(self.bordes_x) - 1, len(self.bordes_y) - 1
+
+    @property
+    def n_zonas(self):
+        n_x, n_y = self.forma
+        return n_x * n_y
+
+    def etiquetas(self):
+        """Nombre de cada zona, en el orden de los códigos."""
+        return [f"{x} - {y}" for x in self.etiquetas_x for y in self.etiquetas_y]
+
+
+def _tramos(bordes, prefijo):
+    return tuple(f"{prefijo} {a:.3g}-{b:.3g}" for a, b in zip(bordes[:-1], bordes[1:]))
+
+
+def rejilla_personalizada(bordes_x, bordes_y, nombre="Personalizada"):
+    bordes_x = tuple(float(b) for b in bordes_x)
+    bordes_y = tuple(float(b) for b in bordes_y)
+    for eje, bordes in (("X", bordes_x), ("Y", bordes_y)):
+        if len(bordes) < 2:
+            raise ValueError(f"Los bordes en {eje} necesitan al menos dos valores")
+        if any(b <= a for a, b in zip(bordes[:-1], bordes[1:])):
+            raise ValueError(f"Los bordes en {eje} deben ser crecientes")
+        if bordes[0] < 0 or bordes[-1] > 100:
+            raise ValueError(f"Los bordes en {eje} deben estar entre 0 y 100")
+    return Rejilla(nombre, bordes_x, bordes_y, _tramos(bordes_x, "X"), _tramos(bordes_y, "Y"))
+
+
+TERCIOS = (0.0, 100 / 3, 200 / 3, 100.0)
+# Carriles de juego de posición: bandas, interiores (hasta el área) y central (ancho del área chica)
+CARRILES = (0.0, 21.1, 36.8, 63.2, 78.9, 100.0)
+
+REJILLAS = {
+    "3x3": Rejilla(
+        "3x3", TERCIOS, TERCIOS,
+        ("Salida", "Medio", "Último tercio"),
+        ("Derecha", "Centro", "Izquierda"),
+    ),
+    "5x3": Rejilla(
+        "5x3", TERCIOS, CARRILES,
+        ("Salida", "Medio", "Último tercio"),
+        ("Banda derecha", "Interior derecho", "Carril central", "Interior izquierdo", "Banda izquierda"),
+    ),
+    "6x4": rejilla_personalizada(np.linspace(0, 100, 7), np.linspace(0, 100, 5), nombre="6x4"),
+}
+
+
+def _indices(valores, bordes):
+    valores = np.asarray(valores, dtype=float)
+    idx = np.digitize(valores, bordes[1:-1])
+    # Igual que np.histogram2d: el borde final se incluye en el último tramo y lo de afuera no cuenta
+    fuera = np.isnan(valores) | (valores < bordes[0]) | (valores > bordes[-1])
+    return np.where(fuera, -1, idx)
+
+
+def asignar_zonas(x, y, rejilla):
+    """Código de zona de cada punto (-1 si falta la coordenada o cae fuera de la rejilla)."""
+    ix = _indices(x, rejilla.bordes_x)
+    iy = _indices(y, rejilla.bordes_y)
+    return np.where((ix < 0) | (iy < 0), -1, ix * rejilla.forma[1] + iy)
+
+
+def zonificar(pases, rejilla):
+    """Códigos de zona de inicio (X, Y) y fin (X2, Y2) de cada pase."""
+    return {
+        "inicio": asignar_zonas(pases["X"], pases["Y"], rejilla),
+        "fin": asignar_zonas(pases["X2"], pases["Y2"], rejilla),
+    }
+
+
+def conteo_por_zona(codigos, rejilla):
+    """Matriz ``n_x x n_y`` de eventos por zona (misma orientación que ``np.histogram2d``)."""
+    codigos = np.asarray(codigos)
+    return np.bincount(codigos[codigos >= 0], minlength=rejilla.n_zonas).reshape(rejilla.forma)
+
+
+def tabla_por_zona(codigos, rejilla, columna="Pases"):
+    """Conteo por zona como tabla ``Zona``/``columna``, de mayor a menor, sin zonas vacías."""
+    conteo = pd.Series(conteo_por_zona(codigos, rejilla).ravel(), index=rejilla.etiquetas())
+    conteo = conteo[conteo > 0].sort_values(ascending=False, kind="stable")
+    return conteo.rename_axis("Zona").reset_index(name=columna)
+
+
+def matriz_transiciones(origen, destino, rejilla):
+    """Conteo zona de inicio -> zona de fin (filas: origen, columnas: destino)."""
+    origen, destino = np.asarray(origen), np.asarray(destino)
+    validos = (origen >= 0) & (destino >= 0)
+    n = rejilla.n_zonas
+    matriz = np.bincount(origen[validos] * n + destino[validos], minlength=n * n).reshape(n, n)
+    etiquetas = rejilla.etiquetas()
+    return pd.DataFrame(matriz, index=pd.Index(etiquetas, name="Inicio"), columns=pd.Index(etiquetas, name="Fin"))